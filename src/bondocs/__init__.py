@@ -35,7 +35,7 @@ from bondocs.document import (
 )
 
 # Export git functionality
-from bondocs.git import git, summarize_diff
+from bondocs.git import git, summarize_diff, summarize_diff_by_path
 
 # Export LLM functionality
 from bondocs.providers import llm
@@ -27,9 +27,9 @@ from bondocs.document import (
 )
 from bondocs.git import git, summarize_diff
 from bondocs.utils.templates import (
-    BONDOCS_CONFIG,
-    DEFAULT_README,
-    PRE_COMMIT_CONFIG,
+    get_bondocs_config,
+    get_default_readme,
+    get_pre_commit_config,
 )
 
 
@@ -76,10 +76,12 @@ def init():
 
     # Create necessary files
     _create_file(
-        Path(".pre-commit-config.yaml"), PRE_COMMIT_CONFIG, ".pre-commit-config.yaml"
+        Path(".pre-commit-config.yaml"),
+        get_pre_commit_config(),
+        ".pre-commit-config.yaml",
     )
-    _create_file(Path(".bondocs.toml"), BONDOCS_CONFIG, ".bondocs.toml")
-    _create_file(Path("README.md"), DEFAULT_README, "README.md")
+    _create_file(Path(".bondocs.toml"), get_bondocs_config(), ".bondocs.toml")
+    _create_file(Path("README.md"), get_default_readme(), "README.md")
 
     # Install pre-commit hooks
     @safe_execution("Failed to install pre-commit hooks", exit_on_error=False)
@@ -4,9 +4,8 @@ Handles loading and accessing configuration from environment variables and TOML
 """
 
 import os
-import time
-from pathlib import Path
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Callable, Optional
 
 import tomllib  # type: ignore
 from dotenv import load_dotenv
@@ -31,10 +30,13 @@ DEFAULTS = {
     "max_tokens": 1024,
 }
 
-# Cache timeout in seconds
-CACHE_TIMEOUT = 30
-_last_load_time: float = 0
-_config_cache: dict[str, Any] = {}
+# Environment variables that override values from .bondocs.toml
+_BONDOCS_ENV_KEYS = (
+    "BONDOCS_PROVIDER",
+    "BONDOCS_FALLBACK_PROVIDER",
+    "BONDOCS_MODEL",
+    "BONDOCS_MAX_TOKENS",
+)
 
 
 class ConfigError(BondocsError):
@@ -43,6 +45,100 @@ class ConfigError(BondocsError):
     pass
 
 
+def _read_config_file() -> Optional[str]:
+    """Read .bondocs.toml from the working directory.
+
+    Returns:
+        The file contents, or None if the file doesn't exist
+    """
+    path = os.path.abspath(".bondocs.toml")
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _read_file(path, mtime_ns)
+
+
+# The file is only read again once its modification time changes
+@lru_cache(maxsize=8)
+def _read_file(path: str, mtime_ns: int) -> str:
+    """Read a configuration file.
+
+    Args:
+        path: Absolute path of the file
+        mtime_ns: Modification time of the file, used as part of the cache key
+
+    Returns:
+        The file contents
+    """
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8")
+
+
+# Where the TOML configuration text comes from; tests can replace this to
+# provide configuration without touching the filesystem
+_config_source: Callable[[], Optional[str]] = _read_config_file
+
+
+def _load_toml(toml_text: str) -> dict[str, Any]:
+    """Parse the TOML configuration text.
+
+    Args:
+        toml_text: Contents of .bondocs.toml
+
+    Returns:
+        The parsed configuration
+    """
+    return tomllib.loads(toml_text)
+
+
+@lru_cache(maxsize=8)
+def _load_config(
+    toml_text: Optional[str],
+    env: tuple[tuple[str, Optional[str]], ...],
+) -> dict[str, Any]:
+    """Build the configuration from defaults, the TOML text and the environment.
+
+    Args:
+        toml_text: Contents of .bondocs.toml, or None if there is none
+        env: Values of the BONDOCS_* environment variables
+
+    Returns:
+        The complete configuration as a dictionary
+    """
+    # Start with defaults
+    config = DEFAULTS.copy()
+
+    # Apply .bondocs.toml if it exists
+    if toml_text is not None:
+        try:
+            config.update(_load_toml(toml_text))
+        except Exception as e:
+            log_error(
+                ConfigError(f"Failed to load .bondocs.toml: {e}"),
+                severity=ErrorSeverity.WARNING,
+            )
+
+    # Environment variables take precedence
+    overrides = dict(env)
+    if provider := overrides["BONDOCS_PROVIDER"]:
+        config["provider"] = provider
+    if fallback_provider := overrides["BONDOCS_FALLBACK_PROVIDER"]:
+        config["fallback_provider"] = fallback_provider
+    if model := overrides["BONDOCS_MODEL"]:
+        config["model"] = model
+    if max_tokens := overrides["BONDOCS_MAX_TOKENS"]:
+        try:
+            config["max_tokens"] = int(max_tokens)
+        except ValueError:
+            log_error(
+                ConfigError(f"Invalid BONDOCS_MAX_TOKENS value: {max_tokens}"),
+                severity=ErrorSeverity.WARNING,
+            )
+
+    return config
+
+
 class Config(ConfigProvider):
     """Configuration provider implementation."""
 
@@ -51,78 +147,21 @@ class Config(ConfigProvider):
         # Initial config load
         self.get_config()
 
-    def _should_reload_config(self) -> bool:
-        """Check if the config cache should be reloaded.
-
-        Returns:
-            True if the cache is empty or has expired, False otherwise
-        """
-        global _last_load_time
-        current_time = time.time()
-
-        # If cache is empty or expired, reload
-        if not _config_cache or (current_time - _last_load_time) > CACHE_TIMEOUT:
-            return True
-
-        # Check if the config file has been modified since last load
-        path = Path(".") / ".bondocs.toml"
-        if path.exists():
-            return path.stat().st_mtime > _last_load_time
-
-        return False
-
     @handle_errors(ConfigError, severity=ErrorSeverity.WARNING)
     def get_config(self) -> dict[str, Any]:
         """Get the complete configuration.
 
+        The configuration is only rebuilt when .bondocs.toml or one of the
+        BONDOCS_* environment variables has changed since the last call.
+
         Returns:
             The complete configuration as a dictionary
 
         Raises:
             ConfigError: If loading the configuration fails
         """
-        global _config_cache, _last_load_time
-
-        # Use cached config if available and not expired
-        if not self._should_reload_config():
-            return _config_cache.copy()
-
-        # Start with defaults
-        config = DEFAULTS.copy()
-
-        # Load from .bondocs.toml if it exists
-        path = Path(".") / ".bondocs.toml"
-        if path.exists():
-            try:
-                toml_config = tomllib.loads(path.read_text())
-                config.update(toml_config)
-            except Exception as e:
-                log_error(
-                    ConfigError(f"Failed to load .bondocs.toml: {e}"),
-                    severity=ErrorSeverity.WARNING,
-                )
-
-        # Environment variables take precedence
-        if provider := os.getenv("BONDOCS_PROVIDER"):
-            config["provider"] = provider
-        if fallback_provider := os.getenv("BONDOCS_FALLBACK_PROVIDER"):
-            config["fallback_provider"] = fallback_provider
-        if model := os.getenv("BONDOCS_MODEL"):
-            config["model"] = model
-        if max_tokens := os.getenv("BONDOCS_MAX_TOKENS"):
-            try:
-                config["max_tokens"] = int(max_tokens)
-            except ValueError:
-                log_error(
-                    ConfigError(f"Invalid BONDOCS_MAX_TOKENS value: {max_tokens}"),
-                    severity=ErrorSeverity.WARNING,
-                )
-
-        # Update cache and timestamp
-        _config_cache = config.copy()
-        _last_load_time = time.time()
-
-        return config
+        env = tuple((key, os.environ.get(key)) for key in _BONDOCS_ENV_KEYS)
+        return _load_config(_config_source(), env).copy()
 
     def get_value(self, key: str, default: Optional[Any] = None) -> Any:
         """Get a specific configuration value.
@@ -163,10 +202,8 @@ class Config(ConfigProvider):
 
         This can be used in tests or when configuration changes are expected.
         """
-        global _config_cache, _last_load_time
-        _config_cache = {}
-        _last_load_time = 0
-        # No need to clear lru_cache as we're not using it anymore
+        _read_file.cache_clear()
+        _load_config.cache_clear()
 
 
 # Global singleton instance for convenience
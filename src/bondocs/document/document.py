@@ -3,6 +3,7 @@
 Handles reading, updating, and patching documentation files.
 """
 
+import os
 from pathlib import Path
 
 from bondocs.core.errors import (
@@ -22,7 +23,22 @@ class DocumentError(BondocsError):
 
 
 class FileSystemDocument(DocumentManager):
-    """File system implementation of DocumentManager."""
+    """File system implementation of DocumentManager.
+
+    Document contents are cached, keyed on each file's identity, modification
+    time and size, so rereading an unchanged document costs a single stat.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the document manager with an empty content cache."""
+        self._cache: dict[Path, tuple[tuple[int, int, int, int], str]] = {}
+
+    def reset_cache(self) -> None:
+        """Forget all cached document contents.
+
+        This is primarily used for testing.
+        """
+        self._cache.clear()
 
     @handle_errors(FileNotFoundError, severity=ErrorSeverity.ERROR)
     def get_document_content(self, path: Path) -> str:
@@ -38,13 +54,22 @@ class FileSystemDocument(DocumentManager):
             FileNotFoundError: If the document doesn't exist
             DocumentError: If reading the document fails
         """
-        if not path.exists():
-            raise FileNotFoundError(f"Document not found: {path}")
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Document not found: {path}") from None
+
+        key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
 
         try:
-            return path.read_text(encoding="utf-8")
+            content = path.read_bytes().decode("utf-8")
         except Exception as e:
             raise DocumentError(f"Failed to read document {path}: {str(e)}") from e
+        self._cache[path] = (key, content)
+        return content
 
     @safe_execution("Failed to update document")
     def update_document(self, path: Path, content: str) -> bool:
@@ -62,6 +87,7 @@ class FileSystemDocument(DocumentManager):
             path.parent.mkdir(parents=True, exist_ok=True)
 
             path.write_text(content, encoding="utf-8")
+            self._cache.pop(path, None)
             return True
         except Exception as e:
             log_error(
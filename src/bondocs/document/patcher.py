@@ -3,10 +3,14 @@
 Handles generating and applying patches to documentation files.
 """
 
+import hashlib
 import subprocess
 import tempfile
 from pathlib import Path
 
+import patch_ng  # type: ignore
+
+from bondocs.core.config import config
 from bondocs.core.errors import (
     ErrorSeverity,
     PatchError,
@@ -17,6 +21,25 @@ from bondocs.core.errors import (
 from bondocs.document.document import doc_manager
 from bondocs.providers import llm
 
+# Paths, relative to the repository root, that patches may target
+_VALID_TARGETS: tuple[str, ...] = ("README.md", "CHANGELOG.md", "docs/runbook")
+
+# Leading path components stripped from patch headers; validated patches
+# always name their target as "+++ b/<path>"
+_STRIP_LEVEL = 1
+
+# Hashes of the provider, model, summary and README for which the LLM
+# produced no patch
+_noop_patches: set[str] = set()
+
+
+def reset_cache() -> None:
+    """Forget the inputs known to produce no patch.
+
+    This is primarily used for testing.
+    """
+    _noop_patches.clear()
+
 
 @handle_errors(PatchError, severity=ErrorSeverity.ERROR)
 def generate_readme_patch(summary: str) -> str:
@@ -31,6 +54,9 @@ def generate_readme_patch(summary: str) -> str:
     Raises:
         PatchError: If generating the patch fails
     """
+    if not summary.strip():
+        return ""
+
     try:
         # Get current README content
         readme_path = Path("README.md")
@@ -39,16 +65,74 @@ def generate_readme_patch(summary: str) -> str:
 
         readme_content = doc_manager.get_document_content(readme_path)
 
+        # Skip the LLM call if this exact input already produced no patch
+        noop_key = hashlib.sha256(
+            "\0".join(
+                (
+                    str(config.get_value("provider", "ollama")),
+                    str(config.get_value("model", "mistral-small3.1:latest")),
+                    summary,
+                    readme_content,
+                )
+            ).encode("utf-8")
+        ).hexdigest()
+        if noop_key in _noop_patches:
+            return ""
+
         # Generate a patch using the LLM
-        return llm.generate_response(
+        patch = llm.generate_response(
             f"Here's the current README.md:\n\n```\n{readme_content}\n```\n\n"
             f"Here's a summary of the changes to document:\n\n{summary}\n\n"
             "Generate a unified diff patch to update the README.md with these changes."
         )
+        if patch is not None and not patch.strip():
+            _noop_patches.add(noop_key)
+        return patch
     except Exception as e:
         raise PatchError(f"Error generating README patch: {str(e)}") from e
 
 
+def _targets_documentation(patch: str) -> bool:
+    """Check whether a patch targets a documentation file.
+
+    Only the first "+++ b/" header is looked at, instead of scanning the
+    whole patch once per allowed target.
+
+    Args:
+        patch: A unified diff patch
+
+    Returns:
+        True if the patch targets README.md, CHANGELOG.md or a runbook
+    """
+    if patch.startswith("+++ b/"):
+        target_start = 6
+    else:
+        header = patch.find("\n+++ b/")
+        if header == -1:
+            return False
+        target_start = header + 7
+    return patch.startswith(_VALID_TARGETS, target_start)
+
+
+def _apply_in_process(patch: str) -> bool:
+    """Apply a single-file patch without shelling out to ``patch``.
+
+    Multi-file patches are left to the ``patch`` binary, since patch_ng may
+    apply some files before failing on another.
+
+    Args:
+        patch: A unified diff patch to apply
+
+    Returns:
+        True if the patch was applied, False if it should be retried with
+        the ``patch`` binary
+    """
+    patch_set = patch_ng.fromstring(patch.encode("utf-8"))
+    if not patch_set or len(patch_set.items) != 1:
+        return False
+    return bool(patch_set.apply(strip=_STRIP_LEVEL))
+
+
 @safe_execution("Failed to apply patch", error_type=PatchError)
 def apply_patch(patch: str) -> bool:
     """Apply a patch to the documentation.
@@ -62,21 +146,30 @@ def apply_patch(patch: str) -> bool:
     if not patch.strip():
         return False
 
-    # Check if the patch targets a documentation file
-    valid_targets = ["+++ b/README.md", "+++ b/CHANGELOG.md", "+++ b/docs/runbook"]
-    if not any(target in patch for target in valid_targets):
+    if not _targets_documentation(patch):
         log_error(
             PatchError("Invalid patch target. Only documentation files are supported."),
             severity=ErrorSeverity.WARNING,
         )
         return False
 
+    try:
+        if _apply_in_process(patch):
+            return True
+    except Exception as e:
+        log_error(
+            PatchError(f"In-process patch failed, retrying with patch: {e}"),
+            severity=ErrorSeverity.INFO,
+        )
+
     try:
         with tempfile.NamedTemporaryFile("w+", suffix=".patch", encoding="utf-8") as f:
             f.write(patch)
             f.flush()
             proc = subprocess.run(
-                ["patch", "-p0", "-i", f.name], capture_output=True, text=True
+                ["patch", f"-p{_STRIP_LEVEL}", "-i", f.name],
+                capture_output=True,
+                text=True,
             )
             if proc.returncode != 0:
                 # Log error for debugging
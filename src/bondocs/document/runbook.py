@@ -3,8 +3,17 @@
 Handles updating runbooks based on git changes.
 """
 
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
+from typing import Callable, Optional, Union
 
+from bondocs.core.config import config
 from bondocs.core.errors import (
     BondocsError,
     ErrorSeverity,
@@ -13,9 +22,13 @@ from bondocs.core.errors import (
     safe_execution,
 )
 from bondocs.document.document import doc_manager
-from bondocs.git import git, summarize_diff
-from bondocs.providers import llm
-from bondocs.providers.prompt import render_prompt
+from bondocs.git import git, summarize_diff, summarize_diff_by_path
+from bondocs.providers import cache, llm
+from bondocs.providers.prompt import (
+    make_renderer,
+    render_multi_runbook_prompt,
+    render_prompt,
+)
 
 
 class RunbookError(BondocsError):
@@ -24,14 +37,63 @@ class RunbookError(BondocsError):
     pass
 
 
+# Generated runbook patches keyed on (summary digest, content digest, file path),
+# used when BONDOCS_LLM_CACHE=1
+_patch_cache: "OrderedDict[tuple[str, str, str], str]" = OrderedDict()
+_patch_cache_lock = threading.Lock()
+
+# Maximum number of generated runbook patches to keep
+PATCH_CACHE_SIZE = 128
+
+# Concurrent LLM requests in per-file mode when BONDOCS_LLM_CONCURRENCY is unset
+DEFAULT_LLM_CONCURRENCY = 4
+
+# Words in a runbook that may name a file or directory
+_PATH_WORD = re.compile(r"[\w./-]+")
+
+
+# Cache the directory listing; the directory's mtime changes whenever a
+# runbook is added, removed or renamed. The absolute path and the device and
+# inode numbers keep directories of different projects apart.
+@lru_cache(maxsize=32)
+def _runbook_paths_cached(
+    working_dir: str, runbook_dir: str, dev: int, ino: int, mtime_ns: int
+) -> tuple[Path, ...]:
+    """List the runbooks in a working directory.
+
+    Args:
+        working_dir: The project directory, as given by the caller
+        runbook_dir: Absolute path of the runbook directory
+        dev: Device number of the runbook directory
+        ino: Inode number of the runbook directory
+        mtime_ns: Modification time of the runbook directory
+
+    Returns:
+        The paths of the runbook files, relative to working_dir like the
+        directory that was passed in
+    """
+    with os.scandir(os.path.join(working_dir, "docs", "runbook")) as entries:
+        return tuple(
+            Path(entry.path)
+            for entry in entries
+            if entry.name.endswith(".md") and entry.is_file()
+        )
+
+
 @handle_errors(RunbookError, severity=ErrorSeverity.WARNING)
 def get_runbook_paths(working_dir: str) -> list[Path]:
     """Get all runbook paths in the project."""
     try:
-        runbook_dir = Path(working_dir) / "docs" / "runbook"
-        if not runbook_dir.exists():
+        runbook_dir = os.path.abspath(os.path.join(working_dir, "docs", "runbook"))
+        try:
+            st = os.stat(runbook_dir)
+        except FileNotFoundError:
             return []
-        return list(runbook_dir.glob("*.md"))
+        return list(
+            _runbook_paths_cached(
+                working_dir, runbook_dir, st.st_dev, st.st_ino, st.st_mtime_ns
+            )
+        )
     except Exception as e:
         raise RunbookError(f"Failed to get runbook paths: {str(e)}") from e
 
@@ -52,22 +114,316 @@ def generate_runbook_patch(summary: str, runbook_content: str, file_path: str) -
         RunbookError: If generating the runbook patch fails
     """
     try:
-        prompt = render_prompt(
-            document_content=runbook_content,
-            summary=summary,
-            doc_type="runbook",
-            file_path=file_path,
+        return _cached_patch(
+            summary,
+            runbook_content,
+            file_path,
+            lambda: render_prompt(
+                document_content=runbook_content,
+                summary=summary,
+                doc_type="runbook",
+                file_path=file_path,
+            ),
         )
-
-        return llm.generate_response(prompt)
     except Exception as e:
         raise RunbookError(f"Error generating runbook patch: {str(e)}") from e
 
 
+def _digest(text: str) -> str:
+    """Hash text for use in a cache key.
+
+    Args:
+        text: The text to hash
+
+    Returns:
+        A short hex digest of the text
+    """
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _cached_patch(
+    summary: str, runbook_content: str, file_path: str, prompt: Callable[[], str]
+) -> str:
+    """Generate a runbook patch, reusing earlier results if caching is enabled.
+
+    Results are kept in memory and in the persistent response cache.
+
+    Args:
+        summary: Summary of git diff changes
+        runbook_content: Current content of the runbook
+        file_path: Path to the runbook file
+        prompt: Builds the prompt, only called if the LLM has to be asked
+
+    Returns:
+        A unified diff string for updating the runbook
+    """
+    if os.getenv("BONDOCS_LLM_CACHE") != "1":
+        return llm.generate_response(prompt())
+
+    key = (_digest(summary), _digest(runbook_content), file_path)
+    with _patch_cache_lock:
+        cached = _patch_cache.get(key)
+        if cached is not None:
+            _patch_cache.move_to_end(key)
+            return cached
+
+    # Fall back to patches stored by earlier runs
+    disk_key = cache.cache_key(
+        str(config.get_value("provider", "ollama")),
+        str(config.get_value("model", "mistral-small3.1:latest")),
+        "runbook",
+        *key,
+    )
+    patch = cache.get(disk_key)
+    if patch is None:
+        patch = llm.generate_response(prompt())
+        if patch is not None:
+            cache.put(disk_key, patch)
+
+    if patch is not None:
+        with _patch_cache_lock:
+            _patch_cache[key] = patch
+            if len(_patch_cache) > PATCH_CACHE_SIZE:
+                _patch_cache.popitem(last=False)
+    return patch
+
+
+def reset_cache() -> None:
+    """Clear the cached runbook listings and generated patches.
+
+    This is primarily used for testing.
+    """
+    _runbook_paths_cached.cache_clear()
+    with _patch_cache_lock:
+        _patch_cache.clear()
+
+
+def _split_patch(patch: str) -> list[str]:
+    """Split a multi-file unified diff into one patch per file.
+
+    Args:
+        patch: A unified diff that may touch several files
+
+    Returns:
+        The per-file patches, in the order they appear
+    """
+    lines = patch.splitlines(keepends=True)
+    patches: list[list[str]] = []
+    has_hunk = False
+
+    for i, line in enumerate(lines):
+        starts_file = line.startswith("diff --git ") or (
+            line.startswith("--- ")
+            and i + 1 < len(lines)
+            and lines[i + 1].startswith("+++ ")
+        )
+        # A file header only starts a new patch once the current one has hunks,
+        # so "diff --git" and "---" lines of the same file stay together
+        if not patches or (starts_file and has_hunk):
+            patches.append([])
+            has_hunk = False
+        patches[-1].append(line)
+        has_hunk = has_hunk or line.startswith("@@")
+
+    joined = ("".join(chunk) for chunk in patches)
+    return [file_patch for file_patch in joined if file_patch.strip()]
+
+
+def _apply_runbook_patch(patch: str, runbook_path: Union[Path, str]) -> bool:
+    """Apply a runbook patch, logging a warning if it fails.
+
+    Args:
+        patch: Unified diff patch for a runbook
+        runbook_path: Path of the runbook, used in the warning
+
+    Returns:
+        True if the patch was applied successfully, False otherwise
+    """
+    if doc_manager.apply_patch(patch):
+        return True
+    log_error(
+        RunbookError(f"Failed to apply patch to {runbook_path}"),
+        severity=ErrorSeverity.WARNING,
+    )
+    return False
+
+
+def _update_runbooks_batched(summary: str, runbooks: list[tuple[Path, str]]) -> bool:
+    """Update all runbooks with a single LLM request.
+
+    Args:
+        summary: Summary of git diff changes
+        runbooks: Pairs of (runbook path, current content)
+
+    Returns:
+        True if all runbook patches were applied successfully, False otherwise
+    """
+    prompt = render_multi_runbook_prompt(
+        summary, [(str(path), content) for path, content in runbooks]
+    )
+    patch = llm.generate_response(prompt)
+    if not patch or not patch.strip():
+        return True
+
+    success = True
+    for file_patch in _split_patch(patch):
+        target = next(
+            (
+                line[len("+++ b/") :].strip()
+                for line in file_patch.splitlines()
+                if line.startswith("+++ b/")
+            ),
+            "runbooks",
+        )
+        success = _apply_runbook_patch(file_patch, target) and success
+    return success
+
+
+def _llm_concurrency() -> int:
+    """Read the number of concurrent LLM requests from BONDOCS_LLM_CONCURRENCY.
+
+    Returns:
+        The configured number, raised to 1 if lower, or DEFAULT_LLM_CONCURRENCY
+        if the variable is unset or not an integer
+    """
+    value = os.getenv("BONDOCS_LLM_CONCURRENCY", "").strip()
+    if not value:
+        return DEFAULT_LLM_CONCURRENCY
+
+    try:
+        workers = int(value)
+    except ValueError:
+        log_error(
+            RunbookError(
+                f"Invalid BONDOCS_LLM_CONCURRENCY {value!r}, "
+                f"using {DEFAULT_LLM_CONCURRENCY}"
+            ),
+            severity=ErrorSeverity.WARNING,
+        )
+        return DEFAULT_LLM_CONCURRENCY
+
+    if workers < 1:
+        log_error(
+            RunbookError(f"BONDOCS_LLM_CONCURRENCY must be at least 1, got {workers}"),
+            severity=ErrorSeverity.WARNING,
+        )
+        return 1
+    return workers
+
+
+def _update_runbooks_per_file(
+    summary: str,
+    runbooks: list[tuple[Path, str]],
+    summaries: Optional[dict[Path, str]] = None,
+) -> bool:
+    """Update each runbook with its own LLM request.
+
+    The requests run concurrently, up to BONDOCS_LLM_CONCURRENCY at a time
+    (DEFAULT_LLM_CONCURRENCY by default); the patches are then applied one by one.
+
+    Args:
+        summary: Summary of git diff changes
+        runbooks: Pairs of (runbook path, current content)
+        summaries: Summaries to use instead of summary for some runbooks,
+            keyed on runbook path
+
+    Returns:
+        True if all runbooks were updated successfully, False otherwise
+    """
+    summaries = summaries or {}
+    # Resolve the template and summary context once per distinct summary
+    renderers: dict[str, Callable[..., str]] = {}
+
+    with ThreadPoolExecutor(max_workers=_llm_concurrency()) as executor:
+        futures = []
+        for runbook_path, runbook_content in runbooks:
+            runbook_summary = summaries.get(runbook_path, summary)
+            if runbook_summary not in renderers:
+                renderers[runbook_summary] = make_renderer("runbook", runbook_summary)
+            render = renderers[runbook_summary]
+            futures.append(
+                executor.submit(
+                    _cached_patch,
+                    runbook_summary,
+                    runbook_content,
+                    str(runbook_path),
+                    partial(render, runbook_content, file_path=str(runbook_path)),
+                )
+            )
+
+    success = True
+
+    # Apply the patches in the main thread, since patching isn't thread-safe
+    for (runbook_path, _), future in zip(runbooks, futures):
+        try:
+            patch = future.result()
+            if not patch or not patch.strip():
+                continue
+
+            if not _apply_runbook_patch(patch, runbook_path):
+                success = False
+        except Exception as e:
+            log_error(
+                RunbookError(f"Error updating runbook {runbook_path}: {str(e)}"),
+                severity=ErrorSeverity.ERROR,
+            )
+            success = False
+
+    return success
+
+
+def _mentioned_names(runbook_content: str) -> set[str]:
+    """Collect the path-like words of a runbook and their path segments.
+
+    Args:
+        runbook_content: Current content of the runbook
+
+    Returns:
+        Every path-like word, with any leading "./" and trailing punctuation
+        removed, along with each of its "/"-separated segments
+    """
+    names = set()
+    for word in _PATH_WORD.findall(runbook_content):
+        word = word.rstrip(".").removeprefix("./")
+        names.add(word)
+        names.update(word.split("/"))
+    return names
+
+
+def _relevant_summary(runbook_content: str, summaries: dict[str, str]) -> str:
+    """Select the parts of a diff summary that a runbook refers to.
+
+    A changed file counts as relevant if the runbook mentions its path, its
+    file name with or without extension, or its top-level directory. Names
+    are compared with whole words and path segments, so "app.py" doesn't
+    match "webapp.py".
+
+    Args:
+        runbook_content: Current content of the runbook
+        summaries: Per-file summary lines, as from summarize_diff_by_path
+
+    Returns:
+        The summary lines for the relevant files, or "" if there are none
+    """
+    mentioned = _mentioned_names(runbook_content)
+    relevant = []
+    for path, line in summaries.items():
+        changed = Path(path)
+        names = {path, changed.name, changed.stem, changed.parts[0]}
+        if not names.isdisjoint(mentioned):
+            relevant.append(line)
+    return "\n".join(relevant)
+
+
 @safe_execution("Failed to update runbooks", error_type=RunbookError)
 def update_runbooks() -> bool:
     """Update all runbooks based on the current changes.
 
+    All runbooks are sent to the LLM in one request, unless
+    BONDOCS_BATCH_RUNBOOKS=0 asks for one request per runbook. With
+    BONDOCS_FILTER_RUNBOOKS=1, runbooks that don't mention any changed file
+    are left out, and the summary only covers the files they mention.
+
     Returns:
         True if all runbooks were updated successfully, False otherwise
     """
@@ -80,35 +436,40 @@ def update_runbooks() -> bool:
         summary = summarize_diff(diff)
         success = True
 
-        # Update each runbook
+        # Read each runbook
+        runbooks: list[tuple[Path, str]] = []
         for runbook_path in get_runbook_paths("."):
             try:
-                runbook_content = doc_manager.get_document_content(runbook_path)
-
-                # Generate and apply the patch
-                patch = generate_runbook_patch(
-                    summary=summary,
-                    runbook_content=runbook_content,
-                    file_path=str(runbook_path),
+                runbooks.append(
+                    (runbook_path, doc_manager.get_document_content(runbook_path))
                 )
-
-                if not patch.strip():
-                    continue
-
-                if not doc_manager.apply_patch(patch):
-                    log_error(
-                        RunbookError(f"Failed to apply patch to {runbook_path}"),
-                        severity=ErrorSeverity.WARNING,
-                    )
-                    success = False
             except Exception as e:
                 log_error(
-                    RunbookError(f"Error updating runbook {runbook_path}: {str(e)}"),
+                    RunbookError(f"Error reading runbook {runbook_path}: {str(e)}"),
                     severity=ErrorSeverity.ERROR,
                 )
                 success = False
 
-        return success
+        # Optionally skip runbooks that don't mention any of the changed files,
+        # and only describe the changes each remaining runbook refers to
+        summaries: dict[Path, str] = {}
+        if os.getenv("BONDOCS_FILTER_RUNBOOKS") == "1":
+            by_path = summarize_diff_by_path(diff)
+            for runbook_path, runbook_content in runbooks:
+                relevant = _relevant_summary(runbook_content, by_path)
+                if relevant:
+                    summaries[runbook_path] = relevant
+            runbooks = [runbook for runbook in runbooks if runbook[0] in summaries]
+            # A batched request covers the changes any of its runbooks refer to
+            lines = set("\n".join(summaries.values()).splitlines())
+            summary = "\n".join(line for line in by_path.values() if line in lines)
+
+        if not runbooks:
+            return success
+
+        if os.getenv("BONDOCS_BATCH_RUNBOOKS", "1") == "0":
+            return _update_runbooks_per_file(summary, runbooks, summaries) and success
+        return _update_runbooks_batched(summary, runbooks) and success
     except Exception as e:
         raise RunbookError(f"Error updating runbooks: {str(e)}") from e
 
@@ -3,5 +3,5 @@
 This package contains modules for interacting with Git repositories.
 """
 
-from bondocs.git.diff import summarize_diff
+from bondocs.git.diff import summarize_diff, summarize_diff_by_path
 from bondocs.git.git import Git, git
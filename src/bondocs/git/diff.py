@@ -4,25 +4,19 @@ Provides functions for summarizing Git diffs.
 """
 
 
-def summarize_diff(diff: str) -> str:
-    """Summarize the diff in a human-readable format.
+def summarize_diff_by_path(diff: str) -> dict[str, str]:
+    """Summarize the diff separately for each changed file.
 
     Args:
         diff: The diff to summarize
 
     Returns:
-        A human-readable summary of the diff
+        A mapping of each changed file path to its summary line
     """
-    if not diff:
-        return "No changes"
-
-    # Split into files
-    files = diff.split("diff --git")
-    if len(files) <= 1:
-        return "No changes"
+    summaries: dict[str, str] = {}
 
-    summary = []
-    for file in files[1:]:  # Skip the first empty split
+    # Split into files, skipping whatever precedes the first header
+    for file in diff.split("diff --git")[1:]:
         # Get the file name
         try:
             file_name = file.split("+++ b/")[1].split("\n")[0]
@@ -34,6 +28,19 @@ def summarize_diff(diff: str) -> str:
         deletions = file.count("\n-") - file.count("\n---")
 
         if additions or deletions:
-            summary.append(f"{file_name}: +{additions} -{deletions}")
+            summaries[file_name] = f"{file_name}: +{additions} -{deletions}"
 
-    return "\n".join(summary) if summary else "No changes"
+    return summaries
+
+
+def summarize_diff(diff: str) -> str:
+    """Summarize the diff in a human-readable format.
+
+    Args:
+        diff: The diff to summarize
+
+    Returns:
+        A human-readable summary of the diff
+    """
+    summaries = summarize_diff_by_path(diff) if diff else {}
+    return "\n".join(summaries.values()) if summaries else "No changes"
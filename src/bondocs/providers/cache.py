@@ -0,0 +1,129 @@
+"""Persistent LLM response cache for Bondocs.
+
+Stores generated patches in a SQLite database so that repeated runs, such as
+re-running the pre-commit hook on an unchanged tree, don't ask the LLM again.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from bondocs.core.errors import BondocsError, ErrorSeverity, handle_errors, log_error
+
+# Location of the response database
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bondocs", "llm.sqlite")
+
+# Entries older than this are purged when the database is opened, in days
+CACHE_TTL_DAYS = 30
+
+_connection: Optional[sqlite3.Connection] = None
+_connection_lock = threading.Lock()
+
+
+class CacheError(BondocsError):
+    """Error raised during response cache operations."""
+
+    pass
+
+
+def cache_key(*parts: str) -> str:
+    """Build a cache key from the values that determine a response.
+
+    Args:
+        *parts: The values the response depends on, e.g. provider, model,
+            document type, file path and the hashed prompt inputs
+
+    Returns:
+        A hex digest identifying the response
+    """
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    """Open the response database, creating it if needed.
+
+    Returns:
+        The database connection, or None if it couldn't be opened
+    """
+    global _connection
+    if _connection is not None:
+        return _connection
+
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        connection = sqlite3.connect(
+            CACHE_PATH, isolation_level=None, check_same_thread=False
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, patch BLOB, created_at INTEGER)"
+        )
+        connection.execute(
+            "DELETE FROM responses WHERE created_at < ?",
+            (int(time.time()) - CACHE_TTL_DAYS * 86400,),
+        )
+    except (OSError, sqlite3.Error) as e:
+        log_error(
+            CacheError(f"Response cache unavailable: {str(e)}"),
+            severity=ErrorSeverity.WARNING,
+        )
+        return None
+
+    _connection = connection
+    return _connection
+
+
+@handle_errors(sqlite3.Error, severity=ErrorSeverity.WARNING)
+def get(key: str) -> Optional[str]:
+    """Look up a cached response.
+
+    Args:
+        key: The key built by cache_key
+
+    Returns:
+        The cached response, or None if there is none
+    """
+    with _connection_lock:
+        connection = _connect()
+        if connection is None:
+            return None
+        row = connection.execute(
+            "SELECT patch FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+    return row[0].decode("utf-8") if row else None
+
+
+@handle_errors(sqlite3.Error, severity=ErrorSeverity.WARNING)
+def put(key: str, response: str) -> None:
+    """Store a response in the cache.
+
+    Args:
+        key: The key built by cache_key
+        response: The response to store
+    """
+    with _connection_lock:
+        connection = _connect()
+        if connection is None:
+            return
+        connection.execute(
+            "INSERT OR REPLACE INTO responses (key, patch, created_at) "
+            "VALUES (?, ?, ?)",
+            (key, response.encode(), int(time.time())),
+        )
+
+
+def reset() -> None:
+    """Close the response database.
+
+    The next lookup opens it again from CACHE_PATH. This is primarily used
+    for testing.
+    """
+    global _connection
+    with _connection_lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
@@ -7,14 +7,18 @@ Ollama, OpenAI, Anthropic, and Azure.
 # mypy: disable-error-code="no-any-return,arg-type,return-value"
 # type: ignore
 
+import hashlib
 import os
-import weakref
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import Sequence
+from functools import cache, lru_cache
 from typing import Any, Optional, TypeVar, Union, cast
 
 import httpx
-from langchain.schema import (  # type: ignore
+from langchain_core.messages import (  # type: ignore
     AIMessage,
     BaseMessage,
     HumanMessage,
@@ -30,14 +34,60 @@ from bondocs.core.errors import (
 )
 from bondocs.core.interfaces import LLMInterface
 from bondocs.providers.prompt import load_system_prompt
+from bondocs.providers.prompt import reset_cache as reset_prompt_cache
 
-# Provider instance cache to avoid recreating providers
-_provider_instances: dict[str, weakref.ref] = {}
+# Default address of the local Ollama server
+OLLAMA_URL = "http://localhost:11434"
+
+# How long an Ollama availability probe result stays valid, in seconds
+OLLAMA_PROBE_TTL = 30
+
+# Responses keyed by a hash of provider, model, system prompt and prompt,
+# so identical requests within a process skip the LLM round-trip
+_response_cache: "OrderedDict[str, str]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+# Maximum number of responses kept in the response cache
+RESPONSE_CACHE_SIZE = 128
 
 # Type variable for provider return
 T = TypeVar("T", bound="LLMProvider")
 
 
+# Chat model classes are imported lazily to avoid startup overhead when a
+# provider isn't used, and resolved only once per process
+@cache
+def _chat_ollama_cls() -> type:
+    """Import and return the ChatOllama class."""
+    from langchain_community.chat_models import ChatOllama  # type: ignore
+
+    return ChatOllama
+
+
+@cache
+def _chat_openai_cls() -> type:
+    """Import and return the ChatOpenAI class."""
+    from langchain_openai import ChatOpenAI  # type: ignore
+
+    return ChatOpenAI
+
+
+@cache
+def _chat_anthropic_cls() -> type:
+    """Import and return the ChatAnthropic class."""
+    from langchain_anthropic import ChatAnthropic  # type: ignore
+
+    return ChatAnthropic
+
+
+@cache
+def _azure_chat_openai_cls() -> type:
+    """Import and return the AzureChatOpenAI class."""
+    from langchain_openai import AzureChatOpenAI  # type: ignore
+
+    return AzureChatOpenAI
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
@@ -54,6 +104,23 @@ class LLMProvider(ABC):
         return True
 
 
+@lru_cache(maxsize=4)
+@handle_errors(Exception, default_return=False)
+def _probe_ollama(url: str, window: int) -> bool:
+    """Probe an Ollama server.
+
+    Args:
+        url: Address of the Ollama server
+        window: Index of the OLLAMA_PROBE_TTL period the probe belongs to,
+            so results expire when the period ends
+
+    Returns:
+        True if the server responded, False otherwise
+    """
+    httpx.get(url, timeout=0.2)
+    return True
+
+
 class OllamaProvider(LLMProvider):
     """Ollama provider for local LLM inference."""
 
@@ -63,12 +130,9 @@ class OllamaProvider(LLMProvider):
         Args:
             model (str): The model to use.
         """
-        # Import here to avoid startup overhead if not used
-        from langchain_community.chat_models import ChatOllama  # type: ignore
-
         self.model = model
-        self.base_url = os.getenv("API_URL", "http://localhost:11434")
-        self.client = ChatOllama(
+        self.base_url = os.getenv("API_URL", OLLAMA_URL)
+        self.client = _chat_ollama_cls()(
             model=model,
             temperature=0.2,
             base_url=self.base_url,
@@ -82,11 +146,20 @@ class OllamaProvider(LLMProvider):
         return self.client(cast(list[BaseMessage], list(messages)))
 
     @classmethod
-    @handle_errors(Exception, default_return=False)
     def is_available(cls) -> bool:
-        """Check if Ollama is running and available."""
-        httpx.get("http://localhost:11434", timeout=0.2)
-        return True
+        """Check if Ollama is running and available.
+
+        The probe result is cached per server for the current
+        OLLAMA_PROBE_TTL window so repeated provider initialization doesn't
+        hit the network every time.
+        """
+        url = os.getenv("API_URL", OLLAMA_URL)
+        return _probe_ollama(url, int(time.monotonic()) // OLLAMA_PROBE_TTL)
+
+    @classmethod
+    def _invalidate_probe(cls) -> None:
+        """Forget the cached availability probe results."""
+        _probe_ollama.cache_clear()
 
 
 class OpenAIProvider(LLMProvider):
@@ -102,9 +175,6 @@ class OpenAIProvider(LLMProvider):
         Raises:
             LLMError: If the OpenAI API key is not set.
         """
-        # Import here to avoid startup overhead if not used
-        from langchain_openai import ChatOpenAI  # type: ignore
-
         api_key = config.get_env("OPENAI_API_KEY")
         if not api_key:
             raise LLMError(
@@ -112,7 +182,7 @@ class OpenAIProvider(LLMProvider):
             )
 
         self.model = model
-        self.client = ChatOpenAI(
+        self.client = _chat_openai_cls()(
             model=model,
             temperature=0.2,
             max_tokens=max_tokens,
@@ -140,9 +210,6 @@ class AnthropicProvider(LLMProvider):
         Raises:
             LLMError: If the Anthropic API key is not set.
         """
-        # Import here to avoid startup overhead if not used
-        from langchain_anthropic import ChatAnthropic  # type: ignore
-
         api_key = config.get_env("ANTHROPIC_API_KEY")
         if not api_key:
             raise LLMError(
@@ -152,20 +219,62 @@ class AnthropicProvider(LLMProvider):
         self.model = model
         # Note: Parameters names may change with library versions
         # Using kwargs to be more flexible with API changes
-        self.client = ChatAnthropic(
-            model_name=model,
-            temperature=0.2,
-            max_tokens_to_sample=max_tokens,
-            api_key=api_key,  # The library will handle conversion to SecretStr
-            timeout=60,  # Add timeout parameter
-        )
+        self._client_kwargs: dict[str, Any] = {
+            "model_name": model,
+            "temperature": 0.2,
+            "max_tokens_to_sample": max_tokens,
+            "api_key": api_key,  # The library will handle conversion to SecretStr
+            "timeout": 60,  # Add timeout parameter
+        }
+        self.client = _chat_anthropic_cls()(**self._client_kwargs)
+        # Clients that send a cacheable system block, keyed on the system prompt
+        self._system_clients: dict[str, Any] = {}
+        self._system_clients_lock = threading.Lock()
+
+    def _client_for(self, system: str) -> Any:
+        """Return a client that sends a system prompt as a cacheable block.
+
+        langchain-anthropic 0.1 neither forwards call kwargs to the API nor
+        accepts content blocks in a SystemMessage, so the block has to be in
+        the client's model_kwargs, which are merged into every request. One
+        client is built per system prompt and never modified afterwards, so
+        concurrent requests can share it.
+
+        Args:
+            system: The system prompt.
+
+        Returns:
+            A ChatAnthropic client for the system prompt.
+        """
+        with self._system_clients_lock:
+            client = self._system_clients.get(system)
+            if client is None:
+                block = {
+                    "type": "text",
+                    "text": system,
+                    "cache_control": {"type": "ephemeral"},
+                }
+                client = _chat_anthropic_cls()(
+                    **self._client_kwargs, model_kwargs={"system": [block]}
+                )
+                self._system_clients[system] = client
+        return client
 
     @handle_errors(error_type=LLMError)
     def generate_response(
         self, messages: Sequence[Union[SystemMessage, HumanMessage]]
     ) -> Any:
-        """Generate a response from the LLM based on the input messages."""
-        return self.client(cast(list[BaseMessage], list(messages)))
+        """Generate a response from the LLM based on the input messages.
+
+        The system prompt is identical across requests, so it is sent as a
+        content block marked for Anthropic prompt caching instead of a plain
+        system message.
+        """
+        messages = list(messages)
+        client = self.client
+        if messages and isinstance(messages[0], SystemMessage):
+            client = self._client_for(str(messages.pop(0).content))
+        return client(cast(list[BaseMessage], messages))
 
 
 class AzureProvider(LLMProvider):
@@ -181,9 +290,6 @@ class AzureProvider(LLMProvider):
         Raises:
             LLMError: If the Azure API key is not set.
         """
-        # Import here to avoid startup overhead if not used
-        from langchain_openai import AzureChatOpenAI  # type: ignore
-
         api_key = config.get_env("AZURE_AI_API_KEY")
         if not api_key:
             raise LLMError(
@@ -191,7 +297,7 @@ class AzureProvider(LLMProvider):
             )
 
         self.model = model
-        self.client = AzureChatOpenAI(
+        self.client = _azure_chat_openai_cls()(
             model=model,
             temperature=0.2,
             max_tokens=max_tokens,
@@ -240,35 +346,97 @@ class ProviderFactory:
         model = config.get_value("model", "mistral-small3.1:latest")
         max_tokens = config.get_value("max_tokens", 1024)
 
-        # Create a unique key for the provider instance
-        instance_key = f"{provider_name}:{model}:{max_tokens}"
+        if not reuse:
+            return _new_provider(provider_class, model, max_tokens)
+        return _build_provider(provider_name, model, max_tokens)
 
-        # Check for an existing provider instance
-        if reuse and instance_key in _provider_instances:
-            provider_ref = _provider_instances[instance_key]
-            provider = provider_ref()
-            if provider is not None:
-                return provider
+    @classmethod
+    def clear_cached_providers(cls) -> None:
+        """Clear all cached provider instances."""
+        _build_provider.cache_clear()
 
-        # Create a new provider instance
-        if provider_name == "ollama":
-            provider = provider_class(model)
-        else:
-            provider = provider_class(model, max_tokens)
 
-        # Cache the provider instance
-        if reuse:
-            _provider_instances[instance_key] = weakref.ref(provider)
+def _new_provider(
+    provider_class: type[LLMProvider], model: str, max_tokens: int
+) -> LLMProvider:
+    """Instantiate a provider for the given model.
 
-        return provider
+    Args:
+        provider_class: The provider class to instantiate.
+        model: The model name.
+        max_tokens: Maximum number of tokens to generate.
 
-    @classmethod
-    def clear_cached_providers(cls) -> None:
-        """Clear all cached provider instances."""
-        _provider_instances.clear()
+    Returns:
+        A new provider instance.
+    """
+    if provider_class is OllamaProvider:
+        return provider_class(model)
+    return provider_class(model, max_tokens)
+
+
+# Keep strong references to recently used providers, so their clients are
+# not rebuilt between patches
+@lru_cache(maxsize=8)
+def _build_provider(provider_name: str, model: str, max_tokens: int) -> LLMProvider:
+    """Create a provider and keep it for later calls with the same settings.
 
+    Args:
+        provider_name: Name of the provider to create.
+        model: The model name.
+        max_tokens: Maximum number of tokens to generate.
+
+    Returns:
+        The cached provider instance.
+    """
+    return _new_provider(ProviderFactory._PROVIDERS[provider_name], model, max_tokens)
 
-class LLMBackend(LLMInterface):
+
+def _response_text(response: Any) -> str:
+    """Extract the text content from a provider response.
+
+    Args:
+        response: The raw response returned by a provider.
+
+    Returns:
+        The response text.
+    """
+    # Chat models return a plain AIMessage, so check the exact type
+    # first and skip the isinstance chain on the hot path
+    if response.__class__ is AIMessage:
+        return response.content or ""
+    elif isinstance(response, AIMessage):
+        return response.content
+    elif isinstance(response, str):
+        return response
+    elif hasattr(response, "content"):
+        return str(response.content)
+    else:
+        return str(response)
+
+
+class _Singleton(type(LLMInterface)):
+    """Metaclass that constructs each class at most once.
+
+    Later calls return the cached instance without running ``__init__`` again.
+    """
+
+    _instances: dict[type, Any] = {}
+    # Reentrant, since a constructor may itself use another singleton
+    _lock = threading.RLock()
+
+    def __call__(cls, *args: Any, **kwargs: Any) -> Any:
+        """Return the cached instance, creating it on first use."""
+        instance = _Singleton._instances.get(cls)
+        if instance is None:
+            with _Singleton._lock:
+                instance = _Singleton._instances.get(cls)
+                if instance is None:
+                    instance = super().__call__(*args, **kwargs)
+                    _Singleton._instances[cls] = instance
+        return instance
+
+
+class LLMBackend(LLMInterface, metaclass=_Singleton):
     """Large Language Model backend integration.
 
     Handles detection and initialization of the appropriate language model
@@ -276,25 +444,10 @@ class LLMBackend(LLMInterface):
     to other providers if needed.
     """
 
-    _instance = None
-    _initialized: bool = False
-    _provider: Optional[LLMProvider] = None
-    _system_prompt: Optional[str] = None
-
-    def __new__(cls):
-        """Create a singleton instance of the LLM backend."""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-
     def __init__(self):
         """Initialize the LLM backend."""
-        # Skip initialization if already initialized
-        if self._initialized:
-            return
-        self._initialized = True
-        self._provider = self._initialize_provider()
-        self._system_prompt = load_system_prompt()
+        self._provider: Optional[LLMProvider] = self._initialize_provider()
+        self._system_prompt: Optional[str] = load_system_prompt()
 
     @property
     def backend(self) -> LLMProvider:
@@ -373,28 +526,59 @@ class LLMBackend(LLMInterface):
         Raises:
             LLMError: If there was an error generating a response.
         """
-        messages = [
-            SystemMessage(content=self.system_prompt),
-            HumanMessage(content=prompt),
-        ]
-
         # If BONDOCS_MOCK is set, return a dummy response for testing
         if os.getenv("BONDOCS_MOCK") == "1":
             return "This is a mock response for testing."
 
+        # Resolve the provider once; a failed initialization is retried per call
+        backend = self.backend
+        if backend is None:
+            raise LLMError("Error generating response: no LLM provider available")
+
+        cache_key = self._cache_key(backend, prompt)
+        with _response_cache_lock:
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                _response_cache.move_to_end(cache_key)
+                return cached
+
         try:
-            response = self.backend.generate_response(messages)
-            if isinstance(response, AIMessage):
-                return response.content
-            elif isinstance(response, str):
-                return response
-            elif hasattr(response, "content"):
-                return str(response.content)
-            else:
-                return str(response)
+            response = backend.generate_response(self._messages(prompt))
         except Exception as e:
             raise LLMError(f"Error generating response: {str(e)}") from e
 
+        return self._remember(cache_key, response)
+
+    def _messages(self, prompt: str) -> list[Union[SystemMessage, HumanMessage]]:
+        """Build the messages sent to the provider for a prompt."""
+        return [
+            SystemMessage(content=self.system_prompt),
+            HumanMessage(content=prompt),
+        ]
+
+    def _cache_key(self, backend: LLMProvider, prompt: str) -> str:
+        """Build the response cache key for a prompt sent to a provider."""
+        return hashlib.sha256(
+            "\0".join(
+                (
+                    type(backend).__name__,
+                    str(config.get_value("model")),
+                    self.system_prompt,
+                    prompt,
+                )
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def _remember(self, cache_key: str, response: Any) -> str:
+        """Extract the response text and store it in the response cache."""
+        text = _response_text(response)
+        if response is not None:
+            with _response_cache_lock:
+                _response_cache[cache_key] = text
+                if len(_response_cache) > RESPONSE_CACHE_SIZE:
+                    _response_cache.popitem(last=False)
+        return text
+
     @handle_errors(error_type=LLMError, severity=ErrorSeverity.ERROR)
     def chat(self, prompt: str) -> str:
         """Generate a chat response.
@@ -415,12 +599,30 @@ class LLMBackend(LLMInterface):
 
         This is primarily used for testing.
         """
-        cls._instance = None
-        cls._initialized = False
-        cls._provider = None
-        cls._system_prompt = None
+        with _Singleton._lock:
+            _Singleton._instances.pop(cls, None)
         ProviderFactory.clear_cached_providers()
+        OllamaProvider._invalidate_probe()
+        with _response_cache_lock:
+            _response_cache.clear()
+        reset_prompt_cache()
+
+
+class _LLMProxy:
+    """Stand-in for the backend singleton that defers its construction.
+
+    Creating ``LLMBackend`` resolves the provider, which may probe Ollama over
+    the network, so it is postponed until an attribute is first accessed.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate attribute access to the backend singleton."""
+        return getattr(LLMBackend(), name)
+
+    def __repr__(self) -> str:
+        """Return a representation that does not construct the backend."""
+        return f"<lazy {LLMBackend.__name__}>"
 
 
-# Global singleton instance for convenience
-llm = LLMBackend()
+# Global singleton instance for convenience, constructed on first use
+llm = _LLMProxy()
@@ -4,68 +4,150 @@ Handles loading, formatting, and rendering of prompts for LLM interactions.
 """
 
 import os
-import re
-from functools import lru_cache
-from typing import Any, Literal, Optional
+import threading
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any, Callable, Literal, Optional
 
-import jinja2
+if TYPE_CHECKING:
+    import jinja2
 
 # Directory where the prompt templates are stored
 _PROMPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# System prompt used when prompt.md is missing
+_DEFAULT_SYSTEM_PROMPT = """You are a documentation assistant. Your task is to update the documentation based on changes to the codebase.
+Please generate a unified diff to update the documentation."""  # noqa: E501
 
-# Cache the system prompt to avoid re-parsing it for each request
-@lru_cache(maxsize=1)
-def load_system_prompt() -> str:
-    """Load the system prompt from the prompt.md file.
+# Marker line that opens the system prompt section of prompt.md
+_SYSTEM_DELIMITER = "---system---"
 
-    Extracts the system prompt section from between the '---system---'
-    delimiter and the first blank line that follows. Provides robust
-    error handling for various edge cases.
+# Directory where compiled templates are kept between runs
+_BYTECODE_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "bondocs", "jinja"
+)
+
+
+def _bytecode_cache() -> "Optional[jinja2.BytecodeCache]":
+    """Create the on-disk cache for compiled templates.
+
+    Falls back to Jinja's own per-user temporary directory, which it creates
+    with mode 0700 and checks the ownership of, when the user cache directory
+    can't be created.
 
     Returns:
-        The extracted system prompt or an empty string if not found
+        The bytecode cache, or None if no cache directory can be used
     """
-    prompt_path = os.path.join(_PROMPT_DIR, "prompt.md")
+    import jinja2
 
     try:
-        with open(prompt_path, encoding="utf-8") as f:
-            text = f.read()
-    except FileNotFoundError:
-        # Fallback to default prompt
-        return """You are a documentation assistant. Your task is to update the documentation based on changes to the codebase.
-Please generate a unified diff to update the documentation."""  # noqa: E501
+        os.makedirs(_BYTECODE_CACHE_DIR, exist_ok=True)
+        return jinja2.FileSystemBytecodeCache(directory=_BYTECODE_CACHE_DIR)
+    except OSError:
+        pass
+    try:
+        return jinja2.FileSystemBytecodeCache()
+    except (OSError, RuntimeError):
+        return None
+
+
+# Guards the first load of the cached values below, so that concurrent first
+# renders (e.g. from the runbook thread pool) only load prompt.md once
+_INIT_LOCK = threading.RLock()
+
+# Parsed system prompt and prompt template, loaded once per process like the
+# templates in the environment below
+_SYSTEM_PROMPT: Optional[str] = None
+_TEMPLATE: "Optional[jinja2.Template]" = None
+
+# Shared template environment, created on first render so that importing this
+# module doesn't pull in jinja2
+_ENV: "Optional[jinja2.Environment]" = None
+
 
-    # Define the pattern to match system prompt section
-    system_pattern = r"^---system---\s*\n(.*?)(?:\n\s*\n|\n*$)"
-    match = re.search(system_pattern, text, re.DOTALL | re.MULTILINE)
+def _environment() -> "jinja2.Environment":
+    """Get the shared template environment, creating it on first use.
 
-    if match:
-        return match.group(1).strip()
+    Templates are compiled once per process and their bytecode is reused
+    across runs; auto_reload is off because the packaged templates don't
+    change at runtime.
 
-    # Fallback to the previous approach if regex doesn't match
-    if text.startswith("---system---"):
-        lines = text.splitlines()
-        system_lines = []
-        found = False
+    Returns:
+        The Jinja2 environment for the prompt templates
+    """
+    global _ENV
+    if _ENV is None:
+        with _INIT_LOCK:
+            if _ENV is None:
+                import jinja2
+
+                _ENV = jinja2.Environment(
+                    loader=jinja2.FileSystemLoader(_PROMPT_DIR),
+                    auto_reload=False,
+                    bytecode_cache=_bytecode_cache(),
+                    trim_blocks=True,
+                    lstrip_blocks=True,
+                    keep_trailing_newline=True,
+                )
+    return _ENV
+
+
+def load_system_prompt() -> str:
+    """Load the system prompt from the prompt.md file.
 
-        for line in lines:
-            if found:
-                if line.strip() == "":
-                    break
-                system_lines.append(line)
-            elif line.strip() == "---system---":
-                found = True
+    Extracts the system prompt section from between the '---system---'
+    delimiter and the first blank line that follows. Provides robust
+    error handling for various edge cases.
 
-        if system_lines:
-            return "\n".join(system_lines).strip()
+    Returns:
+        The extracted system prompt or an empty string if not found
+    """
+    global _SYSTEM_PROMPT
+    if _SYSTEM_PROMPT is None:
+        with _INIT_LOCK:
+            if _SYSTEM_PROMPT is None:
+                try:
+                    _SYSTEM_PROMPT = _parse_system_prompt(
+                        os.path.join(_PROMPT_DIR, "prompt.md")
+                    )
+                except FileNotFoundError:
+                    return _DEFAULT_SYSTEM_PROMPT
+    return _SYSTEM_PROMPT
+
+
+def _parse_system_prompt(path: str) -> str:
+    """Parse the system prompt section out of the prompt file.
 
-    return text.strip()  # Return the whole file as a fallback
+    Args:
+        path: Path to the prompt file
 
+    Returns:
+        The extracted system prompt or the whole file if no section is found
 
-# Cache the template loading to avoid repeated file system access
-@lru_cache(maxsize=1)
-def _load_template() -> jinja2.Template:
+    Raises:
+        FileNotFoundError: If the prompt file doesn't exist
+    """
+    # Text mode translates CRLF and CR line endings to "\n"; lines are read
+    # one at a time so only the file up to the end of the section is decoded
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.rstrip() == _SYSTEM_DELIMITER:
+                break
+        else:
+            # Return the whole file as a fallback
+            f.seek(0)
+            return f.read().strip()
+
+        # The section ends at the first blank or whitespace-only line
+        section: list[str] = []
+        for line in f:
+            if not line.strip():
+                break
+            section.append(line)
+
+    return "".join(section).strip()
+
+
+def _load_template() -> "jinja2.Template":
     """Load the Jinja2 template from the prompt.md file.
 
     Returns:
@@ -74,21 +156,20 @@ def _load_template() -> jinja2.Template:
     Raises:
         FileNotFoundError: If the template file doesn't exist
     """
-    prompt_path = os.path.join(_PROMPT_DIR, "prompt.md")
-
-    try:
-        with open(prompt_path, encoding="utf-8") as f:
-            template_text = f.read()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Prompt template not found at {prompt_path}") from None
-
-    env = jinja2.Environment(
-        loader=jinja2.BaseLoader(),
-        trim_blocks=True,
-        lstrip_blocks=True,
-        keep_trailing_newline=True,
-    )
-    return env.from_string(template_text)
+    global _TEMPLATE
+    if _TEMPLATE is None:
+        with _INIT_LOCK:
+            if _TEMPLATE is None:
+                import jinja2
+
+                try:
+                    _TEMPLATE = _environment().get_template("prompt.md")
+                except jinja2.TemplateNotFound:
+                    prompt_path = os.path.join(_PROMPT_DIR, "prompt.md")
+                    raise FileNotFoundError(
+                        f"Prompt template not found at {prompt_path}"
+                    ) from None
+    return _TEMPLATE
 
 
 def render_template(
@@ -112,13 +193,13 @@ def render_template(
     return template.render(**context)
 
 
-def render_prompt(
+def stream_prompt(
     document_content: str,
     summary: str,
     doc_type: Optional[Literal["readme", "runbook", "changelog"]] = "readme",
     **kwargs: Any,
-) -> str:
-    """Render the prompt template for document updates.
+) -> Iterator[str]:
+    """Render the prompt template for document updates piece by piece.
 
     Args:
         document_content: The content of the document to update
@@ -129,7 +210,7 @@ def render_prompt(
             - commit_message: Commit message (used primarily for changelog updates)
 
     Returns:
-        Rendered prompt template with all context variables
+        An iterator over the chunks of the rendered prompt
 
     Raises:
         ValueError: If required parameters are missing for a specific document type
@@ -139,12 +220,88 @@ def render_prompt(
         raise ValueError("file_path is required for runbook updates")
 
     # Create the template context
+    context = {"document": document_content, "summary": summary, "doc_type": doc_type}
+    if kwargs:
+        context.update(kwargs)
+
+    template = _load_template()
+    return template.generate(context)
+
+
+def render_prompt(
+    document_content: str,
+    summary: str,
+    doc_type: Optional[Literal["readme", "runbook", "changelog"]] = "readme",
+    **kwargs: Any,
+) -> str:
+    """Render the prompt template for document updates.
+
+    Args:
+        document_content: The content of the document to update
+        summary: Summary of the changes
+        doc_type: Type of document being updated
+        **kwargs: Additional context variables to pass to the template
+            - file_path: Path to the file being updated (required for runbooks)
+            - commit_message: Commit message (used primarily for changelog updates)
+
+    Returns:
+        Rendered prompt template with all context variables
+
+    Raises:
+        ValueError: If required parameters are missing for a specific document type
+    """
+    return "".join(stream_prompt(document_content, summary, doc_type, **kwargs))
+
+
+def make_renderer(
+    doc_type: Literal["readme", "runbook", "changelog"],
+    summary: str,
+    **common: Any,
+) -> Callable[..., str]:
+    """Prepare a prompt renderer for documents that share a summary.
+
+    The template and the summary-level context are resolved once, so the
+    returned function only has to add the per-document values.
+
+    Args:
+        doc_type: Type of document being updated
+        summary: Summary of the changes
+        **common: Additional context variables shared by all documents
+
+    Returns:
+        A function taking the document content and per-document context
+        variables (e.g. file_path) and returning the rendered prompt
+    """
+    template = _load_template()
+    base = {"summary": summary, "doc_type": doc_type, **common}
+
+    def render(document_content: str, **extra: Any) -> str:
+        if (
+            doc_type == "runbook"
+            and "file_path" not in extra
+            and "file_path" not in base
+        ):
+            raise ValueError("file_path is required for runbook updates")
+        return template.render({**base, **extra, "document": document_content})
+
+    return render
+
+
+def render_multi_runbook_prompt(summary: str, runbooks: list[tuple[str, str]]) -> str:
+    """Render a single prompt that asks for updates to several runbooks.
+
+    Args:
+        summary: Summary of the changes
+        runbooks: Pairs of (file path, content) for each runbook to update
+
+    Returns:
+        Rendered prompt template covering all of the runbooks
+    """
     context = {
-        "readme": document_content,  # Keep for backward compatibility
-        "document": document_content,
+        "document": "",
         "summary": summary,
-        "doc_type": doc_type,
-        **kwargs,
+        "doc_type": "runbook",
+        "runbooks": [{"path": path, "content": content} for path, content in runbooks],
     }
 
     template = _load_template()
@@ -197,5 +354,9 @@ def reset_cache() -> None:
 
     This is useful for testing or when templates have been modified.
     """
-    _load_template.cache_clear()
-    load_system_prompt.cache_clear()
+    global _SYSTEM_PROMPT, _TEMPLATE
+    with _INIT_LOCK:
+        if _ENV is not None and _ENV.cache is not None:
+            _ENV.cache.clear()
+        _SYSTEM_PROMPT = None
+        _TEMPLATE = None
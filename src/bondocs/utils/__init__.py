@@ -5,8 +5,19 @@ This package contains utility functions and helpers used throughout Bondocs.
 
 # This package is reserved for future utility functions
 
+from typing import Any
+
 from bondocs.utils.templates import (
-    BONDOCS_CONFIG,
-    DEFAULT_README,
-    PRE_COMMIT_CONFIG,
+    get_bondocs_config,
+    get_default_readme,
+    get_pre_commit_config,
 )
+
+
+def __getattr__(name: str) -> Any:
+    """Forward the deprecated template constants to bondocs.utils.templates."""
+    from bondocs.utils import templates
+
+    if name in templates._TEMPLATE_FILES:
+        return getattr(templates, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,51 @@
+"""Template strings for Bondocs.
+
+This package contains templates for the files that Bondocs creates during
+initialization. They are stored as data files and only read when requested.
+"""
+
+from functools import lru_cache
+from importlib.resources import files
+from typing import Any
+
+# Deprecated constant names and the template files they refer to
+_TEMPLATE_FILES = {
+    "PRE_COMMIT_CONFIG": "pre_commit_config.yaml",
+    "BONDOCS_CONFIG": "bondocs_config.toml",
+    "DEFAULT_README": "default_readme.md",
+}
+
+
+@lru_cache(maxsize=8)
+def _read(name: str) -> str:
+    """Read a template file from this package.
+
+    Args:
+        name: File name of the template
+
+    Returns:
+        The template contents
+    """
+    return files(__package__).joinpath(name).read_text(encoding="utf-8")
+
+
+def get_pre_commit_config() -> str:
+    """Get the pre-commit config template."""
+    return _read("pre_commit_config.yaml")
+
+
+def get_bondocs_config() -> str:
+    """Get the Bondocs config template."""
+    return _read("bondocs_config.toml")
+
+
+def get_default_readme() -> str:
+    """Get the default README template."""
+    return _read("default_readme.md")
+
+
+def __getattr__(name: str) -> Any:
+    """Load the deprecated template constants on first access."""
+    if name in _TEMPLATE_FILES:
+        return _read(_TEMPLATE_FILES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
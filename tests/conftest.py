@@ -1,59 +1,197 @@
-import tempfile
+import importlib
+import shutil
+import sys
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 from git import Repo
 
 
-@pytest.fixture
-def temp_git_repo():
-    """Create a temporary git repository for testing."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        repo = Repo.init(temp_dir)
+@pytest.fixture(scope="session")
+def config_module():
+    """Return the bondocs.core.config module.
+
+    bondocs.core re-exports the config instance under the module's name, so
+    the module can't be reached with a plain import.
+    """
+    return importlib.import_module("bondocs.core.config")
+
+
+@pytest.fixture(scope="session")
+def git_repo_template(tmp_path_factory):
+    """Build prototype git repositories once per session.
+
+    Returns a function that takes a mapping of file names to contents and
+    returns the path of a repository with those files in its initial commit.
+    Repositories are built once per distinct set of files.
+    """
+    templates: dict[tuple[tuple[str, str], ...], Path] = {}
+
+    def template(files: dict[str, str]) -> Path:
+        key = tuple(sorted(files.items()))
+        if key not in templates:
+            path = tmp_path_factory.mktemp("git_repo_template")
+            repo = Repo.init(path)
+            with repo.config_writer() as config:
+                config.set_value("user", "email", "test@example.com")
+                config.set_value("user", "name", "Test User")
+
+            for name, content in files.items():
+                (path / name).write_text(content)
+            repo.index.add(list(files))
+            repo.index.commit("Initial commit")
+            templates[key] = path
+        return templates[key]
+
+    return template
+
+
+@pytest.fixture(scope="session")
+def make_git_repo(git_repo_template):
+    """Copy a prototype git repository into a directory.
+
+    Returns a function that takes the initial files and the destination
+    directory, which may already exist, and returns the copied repository.
+    """
+
+    def make(files: dict[str, str], dest: Path) -> Repo:
+        shutil.copytree(git_repo_template(files), dest, dirs_exist_ok=True)
+        return Repo(dest)
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def temp_git_repo(make_git_repo, tmp_path_factory):
+    """Create a temporary git repository for testing.
+
+    The repository is shared by the whole session; _clean_repo restores it
+    after each test that uses it.
+    """
+    repo = make_git_repo(
+        {"README.md": "# Test Project\n\nInitial README content."},
+        tmp_path_factory.mktemp("temp_git_repo"),
+    )
+
+    # Create a test branch
+    repo.create_head("test-branch")
+
+    return repo
 
-        # Create initial README.md
-        readme_path = Path(temp_dir) / "README.md"
-        readme_path.write_text("# Test Project\n\nInitial README content.")
 
-        # Create initial commit
-        repo.index.add(["README.md"])
-        repo.index.commit("Initial commit")
+@pytest.fixture(autouse=True)
+def _reset_document_caches():
+    """Forget cached documents and no-op README inputs after each test.
 
-        # Create a test branch
-        repo.create_head("test-branch")
+    Only modules a test has already imported are reset.
+    """
+    yield
+    document = sys.modules.get("bondocs.document.document")
+    if document is not None:
+        document.doc_manager.reset_cache()
+    patcher = sys.modules.get("bondocs.document.patcher")
+    if patcher is not None:
+        patcher.reset_cache()
 
-        yield repo
 
-        # Cleanup happens automatically when temp_dir is removed
+@pytest.fixture(autouse=True)
+def _clean_repo(request):
+    """Restore the shared git repository after each test that uses it."""
+    if "temp_git_repo" not in request.fixturenames:
+        yield
+        return
+
+    repo = request.getfixturevalue("temp_git_repo")
+    initial_commit = repo.head.commit.hexsha
+    yield
+    repo.git.reset("--hard", initial_commit)
+    repo.git.clean("-fdx")
+
+
+# LangChain chat model classes whose constructors tests replace, by provider
+_CHAT_MODEL_CLASSES = {
+    "ollama": ("langchain_community.chat_models", "ChatOllama"),
+    "openai": ("langchain_openai", "ChatOpenAI"),
+    "anthropic": ("langchain_anthropic", "ChatAnthropic"),
+    "azure": ("langchain_openai", "AzureChatOpenAI"),
+}
+
+
+@pytest.fixture(scope="session")
+def chat_model_mocks():
+    """Create one constructor mock per chat model class for the session."""
+    return {provider: MagicMock(return_value=None) for provider in _CHAT_MODEL_CLASSES}
+
+
+@pytest.fixture(scope="class")
+def _patched_chat_models(chat_model_mocks):
+    """Install the constructor mocks for the duration of a test class or module.
+
+    The LangChain modules are imported here, so only tests that use the mocks
+    pay for importing them.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        for provider, (module, name) in _CHAT_MODEL_CLASSES.items():
+            chat_model = getattr(importlib.import_module(module), name)
+            mp.setattr(chat_model, "__init__", chat_model_mocks[provider])
+        yield chat_model_mocks
+
+
+@pytest.fixture
+def chat_models(_patched_chat_models):
+    """Provide the chat model constructor mocks with fresh call records."""
+    for mock in _patched_chat_models.values():
+        mock.reset_mock()
+    return _patched_chat_models
+
+
+@pytest.fixture
+def mock_httpx_get(monkeypatch):
+    """Mock httpx.get to control Ollama availability."""
+    from bondocs.providers.llm import OllamaProvider
+
+    mock = MagicMock()
+    monkeypatch.setattr("httpx.get", mock)
+    # Probe results are cached, so start and finish with an empty cache
+    OllamaProvider._invalidate_probe()
+    yield mock
+    OllamaProvider._invalidate_probe()
 
 
 @pytest.fixture
 def mock_llm_response(monkeypatch):
-    """Mock LLM responses for testing."""
+    """Mock LLM responses for testing.
 
-    def mock_chat(prompt: str) -> str:
-        if "README.md" in prompt:
-            return """--- a/README.md
+    Each document module gets its own stand-in for the LLM, which answers
+    with a patch for that module's document.
+    """
+    responses = {
+        "bondocs.document.patcher": """--- a/README.md
 +++ b/README.md
 @@ -1,3 +1,4 @@
  # Test Project
 
  Initial README content.
 +Added new feature.
-"""
-        elif "CHANGELOG.md" in prompt:
-            return """--- a/CHANGELOG.md
+""",
+        "bondocs.document.changelog": """--- a/CHANGELOG.md
 +++ b/CHANGELOG.md
 @@ -0,0 +1,4 @@
 +# Changelog
 +
 +## [Unreleased]
 +- Added new feature
-"""
-        return ""
-
-    monkeypatch.setenv("BONDOCS_MOCK", "1")
-    monkeypatch.setattr("bondocs.llm.LLMBackend.chat", mock_chat)
+""",
+    }
+    mocks = {}
+    for module, response in responses.items():
+        mock_llm = MagicMock()
+        mock_llm.generate_response.return_value = response
+        mock_llm.chat.return_value = response
+        monkeypatch.setattr(f"{module}.llm", mock_llm)
+        mocks[module] = mock_llm
+    return mocks
 
 
 @pytest.fixture
@@ -1,9 +1,28 @@
 from pathlib import Path
 
-from bondocs.changelog import get_changelog_path, update_changelog
+import pytest
+from bondocs.document.changelog import get_changelog_path, update_changelog
+from bondocs.document.document import doc_manager
 
 
-def test_changelog_creation(temp_git_repo, mock_llm_response):
+@pytest.fixture
+def in_repo(temp_git_repo, monkeypatch):
+    """Run the test from inside the shared git repository."""
+    monkeypatch.chdir(temp_git_repo.working_dir)
+    return temp_git_repo
+
+
+@pytest.fixture
+def applied_patches(monkeypatch):
+    """Record the patches handed to the document manager."""
+    patches = []
+    monkeypatch.setattr(
+        doc_manager, "apply_patch", lambda patch: patches.append(patch) or True
+    )
+    return patches
+
+
+def test_changelog_creation(temp_git_repo, in_repo, mock_llm_response, applied_patches):
     """Test changelog creation and updates."""
     # Create a new file
     new_file = Path(temp_git_repo.working_dir) / "test.py"
@@ -12,20 +31,23 @@ def test_changelog_creation(temp_git_repo, mock_llm_response):
 
     # Update changelog
     changelog_path = get_changelog_path(temp_git_repo.working_dir)
-    update_changelog("feat: add test file")
+    assert not changelog_path.exists()
+    assert update_changelog("feat: add test file")
 
-    # Check if changelog was created and updated
-    assert changelog_path.exists()
-    content = changelog_path.read_text()
-    assert "Changelog" in content
-    assert "Unreleased" in content
-    assert "Added new feature" in content
+    # Check that the staged changes were sent and the patch was applied
+    mock_llm = mock_llm_response["bondocs.document.changelog"]
+    prompt = mock_llm.generate_response.call_args[0][0]
+    assert "test.py: +1 -0" in prompt
+    assert applied_patches == [mock_llm.generate_response.return_value]
 
 
-def test_changelog_format(temp_git_repo, mock_llm_response):
+def test_changelog_format(temp_git_repo, in_repo, mock_llm_response, applied_patches):
     """Test changelog format and structure."""
-    # Create and stage multiple changes
+    # The shared repository starts clean for every test
     new_file = Path(temp_git_repo.working_dir) / "test.py"
+    assert not new_file.exists()
+
+    # Create and stage multiple changes
     new_file.write_text("print('test')")
     temp_git_repo.index.add(["test.py"])
 
@@ -33,7 +55,16 @@ def test_changelog_format(temp_git_repo, mock_llm_response):
     update_changelog("feat: add test file")
 
     # Check format
-    content = get_changelog_path(temp_git_repo.working_dir).read_text()
-    assert "# Changelog" in content
-    assert "## [Unreleased]" in content
-    assert "- " in content  # Bullet points
+    (content,) = applied_patches
+    assert "+# Changelog" in content
+    assert "+## [Unreleased]" in content
+    assert "+- " in content  # Bullet points
+
+
+def test_no_staged_changes(temp_git_repo, in_repo, mock_llm_response, applied_patches):
+    """Test that nothing is generated without staged changes."""
+    assert not update_changelog("chore: nothing")
+    mock_llm_response[
+        "bondocs.document.changelog"
+    ].generate_response.assert_not_called()
+    assert applied_patches == []
@@ -1,12 +1,21 @@
 import os
-from unittest.mock import patch
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import pytest
-from bondocs.config import DEFAULTS, env, get, load
+import tomllib
+from bondocs.core.config import DEFAULTS, config
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch, config_module):
+    """Start every test without BONDOCS_* overrides from the environment."""
+    for key in config_module._BONDOCS_ENV_KEYS:
+        monkeypatch.delenv(key, raising=False)
 
 
 @pytest.fixture
-def mock_env_vars(monkeypatch):
+def mock_env_vars():
     """Set up environment variables for testing."""
     test_env = {
         "BONDOCS_PROVIDER": "openai",
@@ -17,12 +26,12 @@ def mock_env_vars(monkeypatch):
         "ANTHROPIC_API_KEY": "test-anthropic-key",
         "AZURE_AI_API_KEY": "test-azure-key",
     }
-    for key, value in test_env.items():
-        monkeypatch.setenv(key, value)
-    return test_env
+    # Apply all variables at once; the environment is restored in one step
+    with patch.dict(os.environ, test_env):
+        yield test_env
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_toml_file():
     """Create a mock TOML file content."""
     return """
@@ -42,6 +51,21 @@ patterns = ["*.pyc", "__pycache__"]
 """
 
 
+@pytest.fixture(scope="session")
+def mock_toml_parsed(mock_toml_file):
+    """Parse the mock TOML file content once."""
+    return tomllib.loads(mock_toml_file)
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Make an empty directory the working directory with a clean config."""
+    monkeypatch.chdir(tmp_path)
+    config.reset_cache()
+    yield tmp_path
+    config.reset_cache()
+
+
 def test_defaults():
     """Test default configuration values."""
     assert DEFAULTS["provider"] == "ollama"
@@ -50,93 +74,124 @@ def test_defaults():
     assert DEFAULTS["max_tokens"] == 1024
 
 
-def test_load_defaults():
+def test_load_defaults(monkeypatch, config_module):
     """Test loading default configuration when no file or env vars exist."""
-    with patch("pathlib.Path.exists", return_value=False):
-        config = load()
-        assert config["provider"] == DEFAULTS["provider"]
-        assert config["fallback_provider"] == DEFAULTS["fallback_provider"]
-        assert config["model"] == DEFAULTS["model"]
-        assert config["max_tokens"] == DEFAULTS["max_tokens"]
+    monkeypatch.setattr(config_module, "_config_source", lambda: None)
+    settings = config.get_config()
+    assert settings["provider"] == DEFAULTS["provider"]
+    assert settings["fallback_provider"] == DEFAULTS["fallback_provider"]
+    assert settings["model"] == DEFAULTS["model"]
+    assert settings["max_tokens"] == DEFAULTS["max_tokens"]
 
 
-def test_load_from_toml(mock_toml_file):
+def test_load_from_toml(mock_toml_file, monkeypatch, config_module):
     """Test loading configuration from TOML file."""
-    with (
-        patch("pathlib.Path.exists", return_value=True),
-        patch("pathlib.Path.read_text", return_value=mock_toml_file),
-    ):
-        config = load()
-        assert config["provider"] == "ollama"
-        assert config["fallback_provider"] == "openai"
-        assert config["model"] == "mixtral"
-        assert config["max_tokens"] == 800
-        assert config["temperature"] == 0.2
-        assert "documentation" in config
-        assert "ignore" in config
-
-
-def test_load_from_env(mock_env_vars):
+    monkeypatch.setattr(config_module, "_config_source", lambda: mock_toml_file)
+    settings = config.get_config()
+    assert settings["provider"] == "ollama"
+    assert settings["fallback_provider"] == "openai"
+    assert settings["model"] == "mixtral"
+    assert settings["max_tokens"] == 800
+    assert settings["temperature"] == 0.2
+    assert "documentation" in settings
+    assert "ignore" in settings
+
+
+def test_load_from_env(mock_env_vars, monkeypatch, config_module):
     """Test that environment variables override defaults."""
-    with patch("pathlib.Path.exists", return_value=False):
-        config = load()
-        assert config["provider"] == "openai"
-        assert config["fallback_provider"] == "anthropic"
-        assert config["model"] == "gpt-4-turbo"
-        assert config["max_tokens"] == 2048
+    monkeypatch.setattr(config_module, "_config_source", lambda: None)
+    settings = config.get_config()
+    assert settings["provider"] == "openai"
+    assert settings["fallback_provider"] == "anthropic"
+    assert settings["model"] == "gpt-4-turbo"
+    assert settings["max_tokens"] == 2048
 
 
-def test_env_overrides_toml(mock_env_vars, mock_toml_file):
+def test_env_overrides_toml(
+    mock_env_vars, mock_toml_file, mock_toml_parsed, monkeypatch, config_module
+):
     """Test that environment variables override TOML settings."""
-    with (
-        patch("pathlib.Path.exists", return_value=True),
-        patch("pathlib.Path.read_text", return_value=mock_toml_file),
-    ):
-        config = load()
-        assert config["provider"] == "openai"  # From env, not toml
-        assert config["fallback_provider"] == "anthropic"  # From env, not toml
-        assert config["model"] == "gpt-4-turbo"  # From env, not toml
-        assert config["max_tokens"] == 2048  # From env, not toml
-        # But other TOML settings remain
-        assert "documentation" in config
-        assert "ignore" in config
-
-
-def test_get_function():
-    """Test the get function for retrieving specific config values."""
-    with patch("bondocs.config.load", return_value={"test_key": "test_value"}):
-        assert get("test_key") == "test_value"
-        assert get("non_existent_key") is None
-        assert get("non_existent_key", "default") == "default"
-
-
-def test_env_function():
-    """Test the env function for retrieving environment variables."""
+    monkeypatch.setattr(config_module, "_config_source", lambda: mock_toml_file)
+    load_toml = MagicMock(return_value=mock_toml_parsed)
+    monkeypatch.setattr(config_module, "_load_toml", load_toml)
+    # Drop results built with the real parser for the same inputs
+    config.reset_cache()
+
+    settings = config.get_config()
+    load_toml.assert_called_once_with(mock_toml_file)
+    assert settings["provider"] == "openai"  # From env, not toml
+    assert settings["fallback_provider"] == "anthropic"  # From env, not toml
+    assert settings["model"] == "gpt-4-turbo"  # From env, not toml
+    assert settings["max_tokens"] == 2048  # From env, not toml
+    # But other TOML settings remain
+    assert "documentation" in settings
+    assert "ignore" in settings
+    # The shared parsed TOML is left untouched
+    assert mock_toml_parsed["provider"] == "ollama"
+
+
+def test_get_value():
+    """Test get_value for retrieving specific config values."""
+    with patch.object(config, "get_config", return_value={"test_key": "test_value"}):
+        assert config.get_value("test_key") == "test_value"
+        assert config.get_value("non_existent_key") is None
+        assert config.get_value("non_existent_key", "default") == "default"
+
+
+def test_mock_env_vars_reach_the_environment(mock_env_vars):
+    """Test that the batched environment is visible to config and subprocesses."""
+    assert isinstance(os.environ, os._Environ)
+    for key, value in mock_env_vars.items():
+        assert config.get_env(key) == value
+
+
+def test_get_env():
+    """Test get_env for retrieving environment variables."""
     with patch.dict(os.environ, {"TEST_ENV_VAR": "test_value"}):
-        assert env("TEST_ENV_VAR") == "test_value"
-        assert env("NON_EXISTENT_VAR") is None
+        assert config.get_env("TEST_ENV_VAR") == "test_value"
+        assert config.get_env("NON_EXISTENT_VAR") is None
 
 
-def test_invalid_max_tokens():
+def test_invalid_max_tokens(monkeypatch, config_module):
     """Test handling of invalid BONDOCS_MAX_TOKENS value."""
-    with (
-        patch.dict(os.environ, {"BONDOCS_MAX_TOKENS": "not_a_number"}),
-        patch("pathlib.Path.exists", return_value=False),
-    ):
-        config = load()
+    monkeypatch.setattr(config_module, "_config_source", lambda: None)
+    with patch.dict(os.environ, {"BONDOCS_MAX_TOKENS": "not_a_number"}):
+        settings = config.get_config()
         # Should fall back to default value
-        assert config["max_tokens"] == DEFAULTS["max_tokens"]
+        assert settings["max_tokens"] == DEFAULTS["max_tokens"]
 
 
-def test_toml_parse_error():
+def test_toml_parse_error(monkeypatch, caplog, config_module):
     """Test handling of TOML parse errors."""
-    with (
-        patch("pathlib.Path.exists", return_value=True),
-        patch("pathlib.Path.read_text", return_value="invalid toml content"),
-        patch("builtins.print") as mock_print,
-    ):
-        config = load()
-        # Should fall back to defaults
-        assert config["provider"] == DEFAULTS["provider"]
-        # Should print a warning
-        mock_print.assert_called()
+    monkeypatch.setattr(config_module, "_config_source", lambda: "invalid toml content")
+    settings = config.get_config()
+    # Should fall back to defaults
+    assert settings["provider"] == DEFAULTS["provider"]
+    # Should log a warning
+    assert "Failed to load .bondocs.toml" in caplog.text
+
+
+def test_config_is_parsed_once(workspace, config_module):
+    """Test that an unchanged .bondocs.toml is only parsed once."""
+    Path(".bondocs.toml").write_text('model = "mixtral"\n')
+
+    with patch.object(config_module.tomllib, "loads", wraps=tomllib.loads) as loads:
+        assert config.get_value("model") == "mixtral"
+        assert config.get_value("model") == "mixtral"
+        loads.assert_called_once()
+
+
+def test_config_follows_env_changes(workspace, monkeypatch):
+    """Test that environment overrides apply without resetting the cache."""
+    assert config.get_value("model") == DEFAULTS["model"]
+
+    monkeypatch.setenv("BONDOCS_MODEL", "gpt-4-turbo")
+    assert config.get_value("model") == "gpt-4-turbo"
+
+
+def test_config_source_can_be_replaced(workspace, config_module, monkeypatch):
+    """Test that configuration text can be provided without a file."""
+    monkeypatch.setattr(
+        config_module, "_config_source", lambda: 'provider = "anthropic"\n'
+    )
+    assert config.get_value("provider") == "anthropic"
@@ -1,34 +1,36 @@
 from pathlib import Path
 
-from bondocs.diff import staged_diff, summarize
+import pytest
+from bondocs.git import git, summarize_diff
 
 
-def test_staged_diff(temp_git_repo):
-    """Test staged diff extraction."""
-    # Create a new file
-    new_file = Path(temp_git_repo.working_dir) / "test.py"
-    new_file.write_text("print('test')")
+@pytest.fixture(scope="module")
+def staged_test_py(make_git_repo, tmp_path_factory):
+    """Stage a new test.py in a fresh repository and compute its diff once."""
+    repo = make_git_repo(
+        {"README.md": "# Test Project\n\nInitial README content."},
+        tmp_path_factory.mktemp("staged_test_py"),
+    )
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(repo.working_dir)
+
+        # Create and stage a new file
+        Path("test.py").write_text("print('test')")
+        repo.index.add(["test.py"])
 
-    # Stage the file
-    temp_git_repo.index.add(["test.py"])
+        # Get the diff and its summary
+        diff = git.get_staged_diff()
+        return diff, summarize_diff(diff)
 
-    # Get the diff
-    diff = staged_diff()
+
+def test_staged_diff(staged_test_py):
+    """Test staged diff extraction."""
+    diff, _ = staged_test_py
     assert "test.py" in diff
     assert "print('test')" in diff
 
 
-def test_summarize(temp_git_repo):
+def test_summarize(staged_test_py):
     """Test diff summarization."""
-    # Create and stage a file
-    new_file = Path(temp_git_repo.working_dir) / "test.py"
-    new_file.write_text("print('test')")
-    temp_git_repo.index.add(["test.py"])
-
-    # Get and summarize the diff
-    diff = staged_diff()
-    summary = summarize(diff)
-
-    assert "ADD" in summary
-    assert "test.py" in summary
-    assert "print('test')" in summary
+    _, summary = staged_test_py
+    assert summary == "test.py: +1 -0"
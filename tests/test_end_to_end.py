@@ -1,30 +1,38 @@
-import os
-import subprocess
 from pathlib import Path
 
 import pytest
+from bondocs.cli import app
+from click.testing import CliRunner
+
+README_PATCH = """--- a/README.md
++++ b/README.md
+@@ -1 +1,3 @@
+ # Project
++
++Run `src/app.py` to say hi.
+"""
 
 
 @pytest.fixture()
-def repo(tmp_path, monkeypatch):
-    os.chdir(tmp_path)
-    subprocess.check_call(["git", "init", "-q"])
-    Path("README.md").write_text("# Project\n")
-    subprocess.check_call(["git", "add", "README.md"])
-    subprocess.check_call(["git", "commit", "-m", "init", "-q"])
+def repo(tmp_path, monkeypatch, make_git_repo):
+    git_repo = make_git_repo({"README.md": "# Project\n"}, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("BONDOCS_MOCK", raising=False)
     # monkey‑patch LLM to deterministic output
-    monkeypatch.setenv("BONDOCS_MOCK", "1")
-    yield tmp_path
+    monkeypatch.setattr(
+        "bondocs.document.patcher.llm.generate_response",
+        lambda prompt: README_PATCH,
+    )
+    yield git_repo
 
 
-def test_readme_patched(repo, monkeypatch):
+def test_readme_patched(repo):
     src = Path("src/app.py")
     src.parent.mkdir()
     src.write_text("print('hi')\n")
-    subprocess.check_call(["git", "add", "src/app.py"])
-    from bondocs.cli import run as bondocs_run
+    repo.index.add(["src/app.py"])
+
+    result = CliRunner().invoke(app, ["run"])
 
-    monkeypatch.setenv("BONDOCS_MODEL", "mock")  # use stub
-    bondocs_run()
-    new_readme = Path("README.md").read_text()
-    assert "src/app.py" in new_readme
+    assert result.exit_code == 0, result.output
+    assert "Run `src/app.py` to say hi." in Path("README.md").read_text()
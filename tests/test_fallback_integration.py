@@ -1,43 +1,45 @@
-import os
-import subprocess
-import tempfile
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
-from bondocs.config import load
-from bondocs.llm import LLMBackend
+from bondocs.cli import app
+from bondocs.core.config import config
+from bondocs.providers.llm import LLMBackend
+from click.testing import CliRunner
+from git import Repo
 
 
 @pytest.fixture
-def temp_workspace():
+def temp_workspace(make_git_repo, tmp_path, monkeypatch):
     """Create a temporary workspace with configuration files."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        old_cwd = os.getcwd()
-        os.chdir(temp_dir)
-
-        # Create a minimal .bondocs.toml file
-        bondocs_config = """
-        # Bondocs configuration
-        provider = "ollama"
-        fallback_provider = "openai"
-        model = "mixtral"
-        max_tokens = 800
-        """
-        Path(".bondocs.toml").write_text(bondocs_config)
-
-        # Initialize git repo
-        subprocess.run(["git", "init", "-q"], check=True)
-        Path("README.md").write_text("# Test Project\n\nInitial content.")
-        subprocess.run(["git", "add", "README.md"], check=True)
-        subprocess.run(["git", "config", "user.email", "test@example.com"], check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], check=True)
-        subprocess.run(["git", "commit", "-m", "Initial commit", "-q"], check=True)
-
-        yield temp_dir
-
-        # Clean up
-        os.chdir(old_cwd)
+    # Copy the prebuilt git repo instead of initializing one per test
+    make_git_repo({"README.md": "# Test Project\n\nInitial content."}, tmp_path)
+
+    monkeypatch.chdir(tmp_path)
+    # Only .bondocs.toml should configure the workspace
+    for key in (
+        "BONDOCS_PROVIDER",
+        "BONDOCS_FALLBACK_PROVIDER",
+        "BONDOCS_MODEL",
+        "BONDOCS_MAX_TOKENS",
+        "BONDOCS_MOCK",
+    ):
+        monkeypatch.delenv(key, raising=False)
+
+    # Create a minimal .bondocs.toml file
+    bondocs_config = """
+    # Bondocs configuration
+    provider = "ollama"
+    fallback_provider = "openai"
+    model = "mixtral"
+    max_tokens = 800
+    """
+    Path(".bondocs.toml").write_text(bondocs_config)
+
+    # The backend is a singleton, so build a fresh one in every workspace
+    LLMBackend.reset()
+    yield tmp_path
+    LLMBackend.reset()
 
 
 @pytest.fixture
@@ -50,48 +52,42 @@ def mock_api_keys(monkeypatch):
 
 def test_config_loading_in_workspace(temp_workspace):
     """Test that configuration is properly loaded from the workspace."""
-    config = load()
-    assert config["provider"] == "ollama"
-    assert config["fallback_provider"] == "openai"
-    assert config["model"] == "mixtral"
-    assert config["max_tokens"] == 800
+    settings = config.get_config()
+    assert settings["provider"] == "ollama"
+    assert settings["fallback_provider"] == "openai"
+    assert settings["model"] == "mixtral"
+    assert settings["max_tokens"] == 800
 
 
-def test_fallback_behavior_with_ollama_unavailable(temp_workspace, mock_api_keys):
+def test_fallback_behavior_with_ollama_unavailable(
+    temp_workspace, mock_api_keys, chat_models
+):
     """Test the fallback behavior when Ollama is unavailable."""
     # We'll patch the httpx.get to simulate Ollama being unavailable
     with patch("httpx.get", side_effect=Exception("Connection refused")):
-        # And patch the OpenAI client to verify it's created
-        with patch(
-            "langchain_openai.ChatOpenAI.__init__", return_value=None
-        ) as mock_openai:
-            # Initialize the LLM backend
-            backend = LLMBackend()
+        # Initialize the LLM backend
+        backend = LLMBackend()
 
-            # Verify OpenAI was used as fallback
-            mock_openai.assert_called_once()
+        # Verify OpenAI was used as fallback
+        mock_openai = chat_models["openai"]
+        mock_openai.assert_called_once()
 
-            # Verify the model name passed to OpenAI is correct
-            assert mock_openai.call_args[1]["model_name"] == "mixtral"
+        # Verify the model name passed to OpenAI is correct
+        assert mock_openai.call_args[1]["model"] == "mixtral"
 
 
-def test_env_var_override_in_workspace(temp_workspace, mock_api_keys):
+def test_env_var_override_in_workspace(temp_workspace, mock_api_keys, monkeypatch):
     """Test that environment variables override workspace config."""
     # Set environment variables to override the workspace config
-    os.environ["BONDOCS_PROVIDER"] = "anthropic"
-    os.environ["BONDOCS_FALLBACK_PROVIDER"] = "azure"
-    os.environ["BONDOCS_MODEL"] = "claude-3-opus"
+    monkeypatch.setenv("BONDOCS_PROVIDER", "anthropic")
+    monkeypatch.setenv("BONDOCS_FALLBACK_PROVIDER", "azure")
+    monkeypatch.setenv("BONDOCS_MODEL", "claude-3-opus")
 
     # Reload config
-    config = load()
-    assert config["provider"] == "anthropic"
-    assert config["fallback_provider"] == "azure"
-    assert config["model"] == "claude-3-opus"
-
-    # Clean up
-    del os.environ["BONDOCS_PROVIDER"]
-    del os.environ["BONDOCS_FALLBACK_PROVIDER"]
-    del os.environ["BONDOCS_MODEL"]
+    settings = config.get_config()
+    assert settings["provider"] == "anthropic"
+    assert settings["fallback_provider"] == "azure"
+    assert settings["model"] == "claude-3-opus"
 
 
 def test_new_file_with_ollama_fallback(temp_workspace, mock_api_keys):
@@ -99,13 +95,10 @@ def test_new_file_with_ollama_fallback(temp_workspace, mock_api_keys):
     # Create and stage a new file
     Path("src").mkdir(exist_ok=True)
     Path("src/app.py").write_text('print("Hello from Bondocs!")')
-    subprocess.run(["git", "add", "src/app.py"], check=True)
+    Repo(temp_workspace).index.add(["src/app.py"])
 
-    # Mock the LLMBackend to simulate the fallback behavior
-    with patch("bondocs.llm.LLMBackend") as mock_llm:
-        # Configure the mock to return a patch
-        instance = mock_llm.return_value
-        instance.chat.return_value = """--- a/README.md
+    # Simulate the LLM response that the fallback provider would return
+    readme_patch = """--- a/README.md
 +++ b/README.md
 @@ -1,3 +1,5 @@
  # Test Project
@@ -114,22 +107,23 @@ def test_new_file_with_ollama_fallback(temp_workspace, mock_api_keys):
 +
 +Check out `src/app.py` for a greeting message.
 """
-
+    with patch(
+        "bondocs.document.patcher.llm.generate_response", return_value=readme_patch
+    ) as mock_generate:
         # When running the bondocs CLI
         with patch("httpx.get", side_effect=Exception("Connection refused")):
-            from bondocs.cli import run
-
-            run()
+            result = CliRunner().invoke(app, ["run"])
 
-            # Verify that LLMBackend was properly created
-            mock_llm.assert_called_once()
+    assert result.exit_code == 0, result.output
+    mock_generate.assert_called_once()
+    assert "src/app.py" in mock_generate.call_args[0][0]
 
-            # Verify the README was updated
-            readme_content = Path("README.md").read_text()
-            assert "Check out `src/app.py`" in readme_content
+    # Verify the README was updated
+    readme_content = Path("README.md").read_text()
+    assert "Check out `src/app.py`" in readme_content
 
 
-def test_change_provider_in_config(temp_workspace, mock_api_keys):
+def test_change_provider_in_config(temp_workspace, mock_api_keys, chat_models):
     """Test changing provider in configuration file."""
     # Update the config file to use a different provider
     new_config = """
@@ -142,16 +136,14 @@ def test_change_provider_in_config(temp_workspace, mock_api_keys):
     Path(".bondocs.toml").write_text(new_config)
 
     # Reload the config
-    config = load()
-    assert config["provider"] == "anthropic"
-    assert config["fallback_provider"] == "azure"
+    settings = config.get_config()
+    assert settings["provider"] == "anthropic"
+    assert settings["fallback_provider"] == "azure"
 
     # Test with the anthropic provider directly (no fallback)
-    with patch(
-        "langchain_anthropic.ChatAnthropic.__init__", return_value=None
-    ) as mock_anthropic:
-        backend = LLMBackend()
-        mock_anthropic.assert_called_once()
+    backend = LLMBackend()
+    mock_anthropic = chat_models["anthropic"]
+    mock_anthropic.assert_called_once()
 
-        # Verify the model name passed to Anthropic is correct
-        assert mock_anthropic.call_args[1]["model"] == "claude-3-sonnet"
+    # Verify the model name passed to Anthropic is correct
+    assert mock_anthropic.call_args[1]["model_name"] == "claude-3-sonnet"
@@ -1,183 +1,318 @@
-from unittest.mock import MagicMock, patch
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
 
 import pytest
-from bondocs.llm import LLMBackend
+from bondocs.providers.llm import (
+    OLLAMA_PROBE_TTL,
+    AnthropicProvider,
+    LLMBackend,
+    OllamaProvider,
+    ProviderFactory,
+)
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+# bondocs.providers re-exports the llm instance under the module's name
+llm_module = importlib.import_module("bondocs.providers.llm")
 
 
 @pytest.fixture
-def mock_config(monkeypatch):
-    """Mock the config module to control settings for tests."""
-    config_values = {
-        "provider": "ollama",
-        "fallback_provider": "openai",
-        "model": "mistral-small3.1:latest",
-        "max_tokens": 1024,
-    }
-
-    def mock_get(key, default=None):
-        return config_values.get(key, default)
-
-    def mock_env(key):
-        # Mock environment variables for API keys
-        env_vars = {
-            "OPENAI_API_KEY": "test-openai-key",
-            "ANTHROPIC_API_KEY": "test-anthropic-key",
-            "AZURE_AI_API_KEY": "test-azure-key",
-        }
-        return env_vars.get(key)
-
-    monkeypatch.setattr("bondocs.llm.get", mock_get)
-    monkeypatch.setattr("bondocs.llm.env", mock_env)
+def mock_config(monkeypatch, config_module):
+    """Control the configuration through BONDOCS_* environment variables."""
+    # Ignore any .bondocs.toml in the working directory
+    monkeypatch.setattr(config_module, "_config_source", lambda: None)
+    monkeypatch.delenv("BONDOCS_MOCK", raising=False)
+
+    # Mock environment variables for API keys
+    monkeypatch.setenv("OPENAI_API_KEY", "test-openai-key")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-anthropic-key")
+    monkeypatch.setenv("AZURE_AI_API_KEY", "test-azure-key")
 
     # Function to update config for tests
     def update_config(**kwargs):
-        config_values.update(kwargs)
-
-    return update_config
+        for key, value in kwargs.items():
+            monkeypatch.setenv(f"BONDOCS_{key.upper()}", str(value))
+
+    update_config(
+        provider="ollama",
+        fallback_provider="openai",
+        model="mistral-small3.1:latest",
+        max_tokens=1024,
+    )
+
+    # The backend is a singleton, so build a fresh one in every test
+    LLMBackend.reset()
+    yield update_config
+    LLMBackend.reset()
+
+
+class TestFallback:
+    """Provider selection with the chat model constructors patched per class."""
+
+    @pytest.fixture(autouse=True)
+    def _chat_models(self, chat_models):
+        # The constructors stay patched for the whole class and are reset per test
+        self.m_ollama = chat_models["ollama"]
+        self.m_openai = chat_models["openai"]
+        self.m_anthropic = chat_models["anthropic"]
+        self.m_azure = chat_models["azure"]
+
+    def test_constructors_are_patched(self):
+        """Test that the shared mocks replace the chat model constructors."""
+        from langchain_community.chat_models import ChatOllama
+        from langchain_openai import ChatOpenAI
+
+        assert ChatOllama.__init__ is self.m_ollama
+        assert ChatOpenAI.__init__ is self.m_openai
+
+    def test_ollama_backend_selection(self, mock_config, mock_httpx_get):
+        """Test that Ollama is selected when available."""
+        # Configure httpx to simulate Ollama is available
+        mock_httpx_get.return_value = MagicMock()
+
+        # Test with default config (Ollama provider)
+        backend = LLMBackend()
+        self.m_ollama.assert_called_once()
+        self.m_openai.assert_not_called()
 
+    def test_fallback_to_openai(self, mock_config, mock_httpx_get):
+        """Test fallback to OpenAI when Ollama is unavailable."""
+        # Configure httpx to simulate Ollama is unavailable
+        mock_httpx_get.side_effect = Exception("Connection refused")
 
-@pytest.fixture
-def mock_httpx_get(monkeypatch):
-    """Mock httpx.get to control Ollama availability."""
-    mock = MagicMock()
-    monkeypatch.setattr("httpx.get", mock)
-    return mock
-
-
-def test_ollama_backend_selection(mock_config, mock_httpx_get):
-    """Test that Ollama is selected when available."""
-    # Configure httpx to simulate Ollama is available
-    mock_httpx_get.return_value = MagicMock()
-
-    # Test with default config (Ollama provider)
-    with patch(
-        "langchain_community.chat_models.ChatOllama.__init__", return_value=None
-    ) as mock_ollama:
+        # Test with OpenAI fallback
         backend = LLMBackend()
-        mock_ollama.assert_called_once()
+        self.m_openai.assert_called_once()
+        self.m_ollama.assert_not_called()
 
+    def test_fallback_to_anthropic(self, mock_config, mock_httpx_get):
+        """Test fallback to Anthropic when Ollama is unavailable."""
+        # Configure httpx to simulate Ollama is unavailable
+        mock_httpx_get.side_effect = Exception("Connection refused")
 
-def test_fallback_to_openai(mock_config, mock_httpx_get):
-    """Test fallback to OpenAI when Ollama is unavailable."""
-    # Configure httpx to simulate Ollama is unavailable
-    mock_httpx_get.side_effect = Exception("Connection refused")
+        # Set fallback provider to Anthropic
+        mock_config(fallback_provider="anthropic")
 
-    # Test with OpenAI fallback
-    with patch(
-        "langchain_openai.ChatOpenAI.__init__", return_value=None
-    ) as mock_openai:
         backend = LLMBackend()
-        mock_openai.assert_called_once()
+        self.m_anthropic.assert_called_once()
+        self.m_ollama.assert_not_called()
 
+    def test_fallback_to_azure(self, mock_config, mock_httpx_get):
+        """Test fallback to Azure when Ollama is unavailable."""
+        # Configure httpx to simulate Ollama is unavailable
+        mock_httpx_get.side_effect = Exception("Connection refused")
 
-def test_fallback_to_anthropic(mock_config, mock_httpx_get):
-    """Test fallback to Anthropic when Ollama is unavailable."""
-    # Configure httpx to simulate Ollama is unavailable
-    mock_httpx_get.side_effect = Exception("Connection refused")
-
-    # Set fallback provider to Anthropic
-    mock_config(fallback_provider="anthropic")
+        # Set fallback provider to Azure
+        mock_config(fallback_provider="azure")
 
-    with patch(
-        "langchain_anthropic.ChatAnthropic.__init__", return_value=None
-    ) as mock_anthropic:
         backend = LLMBackend()
-        mock_anthropic.assert_called_once()
+        self.m_azure.assert_called_once()
+        self.m_ollama.assert_not_called()
 
 
-def test_fallback_to_azure(mock_config, mock_httpx_get):
-    """Test fallback to Azure when Ollama is unavailable."""
-    # Configure httpx to simulate Ollama is unavailable
+def test_ollama_probe_caches_failures(mock_httpx_get):
+    """Test that an unavailable Ollama server is remembered too."""
     mock_httpx_get.side_effect = Exception("Connection refused")
+    assert not OllamaProvider.is_available()
+    assert not OllamaProvider.is_available()
+    mock_httpx_get.assert_called_once()
 
-    # Set fallback provider to Azure
-    mock_config(fallback_provider="azure")
 
-    with patch(
-        "langchain_openai.AzureChatOpenAI.__init__", return_value=None
-    ) as mock_azure:
-        backend = LLMBackend()
-        mock_azure.assert_called_once()
+def test_ollama_probe_is_cached_per_url(mock_httpx_get, monkeypatch):
+    """Test that each Ollama address gets its own cached probe."""
+    monkeypatch.setenv("API_URL", "http://ollama.internal:11434")
+    assert OllamaProvider.is_available()
+    monkeypatch.delenv("API_URL")
+    assert OllamaProvider.is_available()
+    assert OllamaProvider.is_available()
 
+    assert [c.args[0] for c in mock_httpx_get.call_args_list] == [
+        "http://ollama.internal:11434",
+        "http://localhost:11434",
+    ]
 
-def test_direct_provider_selection(mock_config):
-    """Test direct provider selection without fallback."""
-    # Test OpenAI as primary provider
-    mock_config(provider="openai")
 
-    with patch(
-        "langchain_openai.ChatOpenAI.__init__", return_value=None
-    ) as mock_openai:
-        backend = LLMBackend()
-        mock_openai.assert_called_once()
+def test_ollama_probe_expires_with_its_window(mock_httpx_get, monkeypatch):
+    """Test that the probe result is reused until its TTL window ends."""
+    now = [10 * OLLAMA_PROBE_TTL]
+    monkeypatch.setattr(llm_module.time, "monotonic", lambda: now[0])
 
-    # Test Anthropic as primary provider
-    mock_config(provider="anthropic")
+    assert OllamaProvider.is_available()
+    now[0] += OLLAMA_PROBE_TTL - 1
+    assert OllamaProvider.is_available()
+    mock_httpx_get.assert_called_once()
 
-    with patch(
-        "langchain_anthropic.ChatAnthropic.__init__", return_value=None
-    ) as mock_anthropic:
-        backend = LLMBackend()
-        mock_anthropic.assert_called_once()
-
-    # Test Azure as primary provider
-    mock_config(provider="azure")
+    # A new window probes the server again
+    now[0] += 1
+    mock_httpx_get.side_effect = Exception("Connection refused")
+    assert not OllamaProvider.is_available()
+    assert mock_httpx_get.call_count == 2
 
-    with patch(
-        "langchain_openai.AzureChatOpenAI.__init__", return_value=None
-    ) as mock_azure:
-        backend = LLMBackend()
-        mock_azure.assert_called_once()
 
+@pytest.mark.parametrize("provider", ["openai", "anthropic", "azure"])
+def test_direct_provider_selection(mock_config, chat_models, provider):
+    """Test direct provider selection without fallback."""
+    mock_config(provider=provider, model="gpt-4-turbo")
 
-def test_error_on_missing_api_key(mock_config):
-    """Test error is raised when API key is missing."""
-    # Configure to use OpenAI but with missing API key
-    mock_config(provider="openai")
+    backend = LLMBackend()
+    chat_models[provider].assert_called_once()
+    for other, mock in chat_models.items():
+        if other != provider:
+            mock.assert_not_called()
+
+    # The model and API key come from the configuration
+    kwargs = chat_models[provider].call_args.kwargs
+    assert "gpt-4-turbo" in (kwargs.get("model"), kwargs.get("model_name"))
+    assert kwargs["api_key"] == f"test-{provider}-key"
+
+
+@pytest.mark.parametrize(
+    "provider,env_key",
+    [
+        ("openai", "OPENAI_API_KEY"),
+        ("anthropic", "ANTHROPIC_API_KEY"),
+        ("azure", "AZURE_AI_API_KEY"),
+    ],
+)
+def test_error_on_missing_api_key(
+    mock_config, chat_models, monkeypatch, caplog, provider, env_key
+):
+    """Test that a missing API key is reported and leaves no provider."""
+    # Configure the provider but with a missing API key
+    mock_config(provider=provider, fallback_provider=provider)
+    monkeypatch.delenv(env_key)
 
-    with patch("bondocs.llm.env", return_value=None):
-        with pytest.raises(ValueError, match="OPENAI_API_KEY.*required"):
-            backend = LLMBackend()
+    backend = LLMBackend()
+    assert backend._provider is None
+    assert f"LLMError: {env_key} environment variable is required" in caplog.text
+    chat_models[provider].assert_not_called()
 
-    # Configure to use Anthropic but with missing API key
-    mock_config(provider="anthropic")
 
-    with patch("bondocs.llm.env", return_value=None):
-        with pytest.raises(ValueError, match="ANTHROPIC_API_KEY.*required"):
-            backend = LLMBackend()
+def test_unsupported_provider(mock_config, caplog):
+    """Test that an unsupported provider is reported and leaves no provider."""
+    # Configure to use an unsupported provider
+    mock_config(provider="unsupported", fallback_provider="unsupported")
 
-    # Configure to use Azure but with missing API key
-    mock_config(provider="azure")
+    backend = LLMBackend()
+    assert backend._provider is None
+    assert "Unsupported provider: unsupported" in caplog.text
 
-    with patch("bondocs.llm.env", return_value=None):
-        with pytest.raises(ValueError, match="AZURE_AI_API_KEY.*required"):
-            backend = LLMBackend()
 
+def test_chat_response_handling(mock_config):
+    """Test that provider responses are turned into text."""
+    backend = LLMBackend()
+    backend._provider = MagicMock()
 
-def test_unsupported_provider(mock_config):
-    """Test error is raised for unsupported provider."""
-    # Configure to use an unsupported provider
-    mock_config(provider="unsupported")
+    # Chat models return messages
+    backend._provider.generate_response.return_value = AIMessage(
+        content="Test response"
+    )
+    assert backend.generate_response("Test prompt") == "Test response"
 
-    with pytest.raises(ValueError, match="Unsupported provider"):
-        backend = LLMBackend()
+    # Other objects with content are converted too
+    mock_response = MagicMock()
+    mock_response.content = "Other response"
+    backend._provider.generate_response.return_value = mock_response
+    assert backend.generate_response("Other prompt") == "Other response"
 
+    # Plain strings are returned as they are
+    backend._provider.generate_response.return_value = "Plain response"
+    assert backend.generate_response("Plain prompt") == "Plain response"
 
-def test_chat_response_handling(mock_config):
-    """Test that chat responses are properly handled."""
-    # Mock the backend response
-    mock_backend = MagicMock()
-    mock_response = MagicMock()
-    mock_response.content = "Test response"
-    mock_backend.return_value = mock_response
 
+def test_identical_prompts_are_cached(mock_config):
+    """Test that repeating a prompt reuses the previous response."""
     backend = LLMBackend()
-    backend.backend = mock_backend
+    provider = MagicMock()
+    provider.generate_response.return_value = AIMessage(content="--- a/README.md")
+    backend._provider = provider
+
+    assert backend.generate_response("prompt") == "--- a/README.md"
+    assert backend.generate_response("prompt") == "--- a/README.md"
+    provider.generate_response.assert_called_once()
 
-    response = backend.chat("Test prompt")
-    assert response == "Test response"
 
-    # Test handling of list response
-    mock_backend.return_value = [mock_response]
-    response = backend.chat("Test prompt")
-    assert response == "Test response"
+def test_missing_provider_is_initialized_once_per_request(mock_config, monkeypatch):
+    """Test that a request retries a failed provider initialization only once."""
+    backend = LLMBackend()
+    backend._provider = None
+    initialize = MagicMock(return_value=None)
+    monkeypatch.setattr(backend, "_initialize_provider", initialize)
+
+    assert backend.generate_response("prompt") is None
+    initialize.assert_called_once()
+
+
+def test_anthropic_system_prompt_is_cacheable(monkeypatch):
+    """Test that the Anthropic system prompt is sent as a cacheable block."""
+    messages_api = pytest.importorskip("anthropic.resources.messages")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test")
+    create = MagicMock()
+    create.return_value.content = [MagicMock(text="--- a/README.md")]
+    monkeypatch.setattr(messages_api.Messages, "create", create)
+
+    provider = AnthropicProvider("claude-3-haiku-20240307", 1000)
+    response = provider.generate_response(
+        [SystemMessage(content="system"), HumanMessage(content="prompt")]
+    )
+
+    assert response.content == "--- a/README.md"
+    request = create.call_args.kwargs
+    assert request["system"] == [
+        {"type": "text", "text": "system", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert request["messages"] == [{"role": "user", "content": "prompt"}]
+    # The shared client is left untouched for other threads
+    assert "system" not in provider.client.model_kwargs
+
+
+def test_llm_is_constructed_on_first_use(monkeypatch):
+    """Test that the module-level llm defers creating the backend."""
+    monkeypatch.setenv("BONDOCS_MOCK", "1")
+    LLMBackend.reset()
+    init = MagicMock(return_value=None)
+    monkeypatch.setattr(LLMBackend, "__init__", init)
+
+    try:
+        repr(llm_module.llm)
+        init.assert_not_called()
+        assert llm_module.llm.chat.__self__ is LLMBackend()
+        init.assert_called_once()
+    finally:
+        LLMBackend.reset()
+
+
+def test_backend_is_constructed_once_across_threads(monkeypatch):
+    """Test that concurrent first uses share a single backend."""
+    LLMBackend.reset()
+
+    calls = []
+
+    def slow_init(self):
+        calls.append(self)
+        time.sleep(0.01)
+
+    monkeypatch.setattr(LLMBackend, "__init__", slow_init)
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            backends = list(executor.map(lambda _: LLMBackend(), range(8)))
+        assert all(backend is backends[0] for backend in backends)
+        assert len(calls) == 1
+    finally:
+        LLMBackend.reset()
+
+
+def test_provider_instances_are_reused(monkeypatch):
+    """Test that providers with the same settings are only built once."""
+    ProviderFactory.clear_cached_providers()
+    init = MagicMock(return_value=None)
+    monkeypatch.setattr(OllamaProvider, "__init__", init)
+
+    try:
+        first = ProviderFactory.create("ollama")
+        assert ProviderFactory.create("ollama") is first
+        init.assert_called_once()
+    finally:
+        ProviderFactory.clear_cached_providers()
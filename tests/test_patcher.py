@@ -0,0 +1,101 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from bondocs.document.patcher import (
+    apply_patch,
+    generate_readme_patch,
+)
+
+README_PATCH = """--- a/README.md
++++ b/README.md
+@@ -1,3 +1,5 @@
+ # Test Project
+
+ Initial content.
++
++See `src/app.py` for example code.
+"""
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Create a workspace with a README.md and make it the working directory."""
+    monkeypatch.chdir(tmp_path)
+    Path("README.md").write_text("# Test Project\n\nInitial content.\n")
+    return tmp_path
+
+
+def test_apply_patch_in_process(workspace):
+    """Test that a single-file patch is applied without running patch."""
+    with patch("bondocs.document.patcher.subprocess.run") as mock_run:
+        assert apply_patch(README_PATCH)
+        mock_run.assert_not_called()
+
+    assert "See `src/app.py` for example code." in Path("README.md").read_text()
+
+
+def test_apply_patch_rejects_non_doc_targets(workspace):
+    """Test that patches for non-documentation files are rejected."""
+    source_patch = README_PATCH.replace("README.md", "src/app.py")
+    assert not apply_patch(source_patch)
+
+
+def test_generate_readme_patch_reads_current_readme(workspace, monkeypatch):
+    """Test that README edits are picked up between patch generations."""
+    prompts = []
+    monkeypatch.setattr(
+        "bondocs.document.patcher.llm.generate_response",
+        lambda prompt: prompts.append(prompt) or "",
+    )
+
+    generate_readme_patch("src/app.py: +1 -0")
+    Path("README.md").write_text("# Renamed Project\n")
+    generate_readme_patch("src/app.py: +1 -0")
+
+    assert "Initial content." in prompts[0]
+    assert "# Renamed Project" in prompts[1]
+
+
+def test_apply_patch_strips_prefixes_for_new_files(workspace):
+    """Test that a/ and b/ prefixes are stripped when a patch creates a file."""
+    changelog_patch = """--- /dev/null
++++ b/CHANGELOG.md
+@@ -0,0 +1,2 @@
++# Changelog
++- feat: add example code
+"""
+    assert apply_patch(changelog_patch)
+    assert Path("CHANGELOG.md").read_text().startswith("# Changelog")
+    assert not Path("b").exists()
+
+
+def test_apply_patch_falls_back_with_same_strip_level(workspace, monkeypatch):
+    """Test that the patch binary fallback strips the same prefixes."""
+    monkeypatch.setattr(
+        "bondocs.document.patcher._apply_in_process", lambda patch: False
+    )
+    with patch("bondocs.document.patcher.subprocess.run") as mock_run:
+        mock_run.return_value.returncode = 0
+        assert apply_patch(README_PATCH)
+
+    assert mock_run.call_args.args[0][:2] == ["patch", "-p1"]
+
+
+def test_generate_readme_patch_skips_known_noops(workspace, monkeypatch):
+    """Test that empty summaries and known no-op inputs skip the LLM."""
+    prompts = []
+    monkeypatch.setattr(
+        "bondocs.document.patcher.llm.generate_response",
+        lambda prompt: prompts.append(prompt) or "",
+    )
+
+    assert generate_readme_patch("  \n") == ""
+    assert generate_readme_patch("docs/notes.txt: +1 -0") == ""
+    assert generate_readme_patch("docs/notes.txt: +1 -0") == ""
+    assert len(prompts) == 1
+
+    # Another model may well want to change the README
+    monkeypatch.setenv("BONDOCS_MODEL", "another-model")
+    assert generate_readme_patch("docs/notes.txt: +1 -0") == ""
+    assert len(prompts) == 2
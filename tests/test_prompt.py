@@ -0,0 +1,86 @@
+import jinja2
+from bondocs.providers.prompt import (
+    _bytecode_cache,
+    _load_template,
+    _parse_system_prompt,
+    load_system_prompt,
+    make_renderer,
+    render_prompt,
+    reset_cache,
+)
+
+
+def test_template_is_reused():
+    """Test that the compiled template is cached between renders."""
+    reset_cache()
+    assert _load_template() is _load_template()
+
+
+def test_bytecode_cache_falls_back_to_private_directory(monkeypatch):
+    """Test that an unusable user cache falls back to Jinja's per-user directory."""
+
+    def makedirs(*args, **kwargs):
+        raise PermissionError("read-only home")
+
+    monkeypatch.setattr("bondocs.providers.prompt.os.makedirs", makedirs)
+    cache = _bytecode_cache()
+    assert isinstance(cache, jinja2.FileSystemBytecodeCache)
+    assert cache.directory == jinja2.FileSystemBytecodeCache().directory
+
+
+def test_render_prompt_includes_context():
+    """Test that the document and summary end up in the rendered prompt."""
+    prompt = render_prompt(document_content="# My Project", summary="src/app.py: +1 -0")
+    assert "# My Project" in prompt
+    assert "src/app.py: +1 -0" in prompt
+
+
+def test_load_system_prompt():
+    """Test that only the system section of prompt.md is returned."""
+    reset_cache()
+    system_prompt = load_system_prompt()
+    assert system_prompt.startswith("You are Bondocs")
+    assert "---system---" not in system_prompt
+    assert "{{" not in system_prompt
+
+
+def test_system_prompt_section_is_sliced(tmp_path):
+    """Test parsing a system section followed by the rest of the template."""
+    prompt_file = tmp_path / "prompt.md"
+    prompt_file.write_text("---system---\nBe brief.\nUse diffs.\n\n{{ document }}\n")
+    assert _parse_system_prompt(str(prompt_file)) == "Be brief.\nUse diffs."
+
+    prompt_file.write_text("Just a prompt.\n")
+    assert _parse_system_prompt(str(prompt_file)) == "Just a prompt."
+
+
+def test_system_prompt_section_ends_at_blank_line(tmp_path):
+    """Test CRLF files, whitespace-only blank lines and an anchored delimiter."""
+    prompt_file = tmp_path / "prompt.md"
+    prompt_file.write_bytes(b"---system---\r\nBe brief.\r\n\r\n{{ document }}\r\nmore")
+    assert _parse_system_prompt(str(prompt_file)) == "Be brief."
+
+    prompt_file.write_text("---system---\nBe brief.\n  \t\n{{ document }}\n")
+    assert _parse_system_prompt(str(prompt_file)) == "Be brief."
+
+    prompt_file.write_text("Use ---system--- markers.\n\n---system---\nBe brief.\n")
+    assert _parse_system_prompt(str(prompt_file)) == "Be brief."
+
+
+def test_make_renderer_matches_render_prompt():
+    """Test that a prepared renderer produces the same prompt as render_prompt."""
+    render = make_renderer("runbook", "src/app.py: +1 -0")
+    assert render("# Deploy", file_path="docs/runbook/deploy.md") == render_prompt(
+        document_content="# Deploy",
+        summary="src/app.py: +1 -0",
+        doc_type="runbook",
+        file_path="docs/runbook/deploy.md",
+    )
+
+
+def test_make_renderer_extra_context_overrides_common():
+    """Test that per-document values may repeat summary-level keys."""
+    render = make_renderer("readme", "src/app.py: +1 -0", commit_message="feat")
+    prompt = render("# My Project", summary="src/cli.py: +2 -0", commit_message="fix")
+    assert "src/cli.py: +2 -0" in prompt
+    assert "src/app.py: +1 -0" not in prompt
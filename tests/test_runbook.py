@@ -0,0 +1,279 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from bondocs.document.runbook import (
+    DEFAULT_LLM_CONCURRENCY,
+    _llm_concurrency,
+    _relevant_summary,
+    generate_runbook_patch,
+    get_runbook_paths,
+    reset_cache,
+    update_runbooks,
+)
+from bondocs.providers import cache
+
+MULTI_RUNBOOK_PATCH = """--- a/docs/runbook/deploy.md
++++ b/docs/runbook/deploy.md
+@@ -1 +1,2 @@
+ # Deploy
++Run the migrations first.
+--- a/docs/runbook/rollback.md
++++ b/docs/runbook/rollback.md
+@@ -1 +1,2 @@
+ # Rollback
++Revert the migrations last.
+"""
+
+
+@pytest.fixture
+def runbook_dir(tmp_path):
+    """Create a project with a runbook directory."""
+    runbook_dir = tmp_path / "docs" / "runbook"
+    runbook_dir.mkdir(parents=True)
+    (runbook_dir / "deploy.md").write_text("# Deploy\n")
+    return runbook_dir
+
+
+def test_get_runbook_paths_missing_dir(tmp_path):
+    """Test that a project without runbooks has no runbook paths."""
+    assert get_runbook_paths(str(tmp_path)) == []
+
+
+def test_get_runbook_paths_is_cached(tmp_path, runbook_dir):
+    """Test that the runbook directory is only listed again after it changes."""
+    assert get_runbook_paths(str(tmp_path)) == [runbook_dir / "deploy.md"]
+
+    with patch("bondocs.document.runbook.os.scandir") as mock_scandir:
+        get_runbook_paths(str(tmp_path))
+        mock_scandir.assert_not_called()
+
+    (runbook_dir / "rollback.md").write_text("# Rollback\n")
+    stat = runbook_dir.stat()
+    os.utime(runbook_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert sorted(p.name for p in get_runbook_paths(str(tmp_path))) == [
+        "deploy.md",
+        "rollback.md",
+    ]
+
+
+def test_get_runbook_paths_includes_symlinked_runbooks(tmp_path, runbook_dir):
+    """Test that symlinked runbooks are listed, as Path.glob used to."""
+    shared = tmp_path / "shared.md"
+    shared.write_text("# Shared\n")
+    (runbook_dir / "shared.md").symlink_to(shared)
+    (runbook_dir / "notes.md").mkdir()
+
+    paths = get_runbook_paths(str(tmp_path))
+
+    assert sorted(p.name for p in paths) == ["deploy.md", "shared.md"]
+
+
+def test_get_runbook_paths_keeps_projects_apart(tmp_path, monkeypatch):
+    """Test that projects whose runbook dirs share an mtime aren't confused."""
+    for name in ("alpha", "beta"):
+        runbook_dir = tmp_path / name / "docs" / "runbook"
+        runbook_dir.mkdir(parents=True)
+        (runbook_dir / f"{name}.md").write_text(f"# {name}\n")
+        os.utime(runbook_dir, ns=(0, 1_000_000_000))
+
+    for name in ("alpha", "beta"):
+        monkeypatch.chdir(tmp_path / name)
+        assert [p.name for p in get_runbook_paths(".")] == [f"{name}.md"]
+
+
+def test_update_runbooks_uses_one_request(tmp_path, runbook_dir, monkeypatch):
+    """Test that all runbooks are updated from a single LLM response."""
+    (runbook_dir / "rollback.md").write_text("# Rollback\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("BONDOCS_BATCH_RUNBOOKS", raising=False)
+    monkeypatch.setattr(
+        "bondocs.document.runbook.git.get_staged_diff", lambda: "diff --git a/x b/x"
+    )
+    monkeypatch.setattr(
+        "bondocs.document.runbook.summarize_diff", lambda diff: "x: +1 -0"
+    )
+    prompts = []
+    monkeypatch.setattr(
+        "bondocs.document.runbook.llm.generate_response",
+        lambda prompt: prompts.append(prompt) or MULTI_RUNBOOK_PATCH,
+    )
+    applied = []
+    monkeypatch.setattr(
+        "bondocs.document.runbook.doc_manager.apply_patch",
+        lambda patch: applied.append(patch) or True,
+    )
+
+    assert update_runbooks()
+
+    assert len(prompts) == 1
+    assert "# Deploy" in prompts[0] and "# Rollback" in prompts[0]
+    assert [patch.splitlines()[0] for patch in applied] == [
+        "--- a/docs/runbook/deploy.md",
+        "--- a/docs/runbook/rollback.md",
+    ]
+
+
+def test_update_runbooks_survives_failed_request(tmp_path, runbook_dir, monkeypatch):
+    """Test that a failed batched request leaves the runbooks alone."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("BONDOCS_BATCH_RUNBOOKS", raising=False)
+    monkeypatch.setattr(
+        "bondocs.document.runbook.git.get_staged_diff", lambda: "diff --git a/x b/x"
+    )
+    # generate_response returns None once handle_errors has logged an LLMError
+    monkeypatch.setattr(
+        "bondocs.document.runbook.llm.generate_response", lambda prompt: None
+    )
+    applied = []
+    monkeypatch.setattr(
+        "bondocs.document.runbook.doc_manager.apply_patch",
+        lambda patch: applied.append(patch) or True,
+    )
+
+    assert update_runbooks()
+    assert applied == []
+
+
+def test_update_runbooks_per_file(tmp_path, runbook_dir, monkeypatch):
+    """Test that per-file mode requests and applies a patch for each runbook."""
+    (runbook_dir / "rollback.md").write_text("# Rollback\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BONDOCS_BATCH_RUNBOOKS", "0")
+    monkeypatch.setenv("BONDOCS_LLM_CONCURRENCY", "2")
+    monkeypatch.setattr(
+        "bondocs.document.runbook.git.get_staged_diff", lambda: "diff --git a/x b/x"
+    )
+    monkeypatch.setattr(
+        "bondocs.document.runbook.summarize_diff", lambda diff: "x: +1 -0"
+    )
+    monkeypatch.setattr(
+        "bondocs.document.runbook.llm.generate_response",
+        lambda prompt: "--- a/docs/runbook/deploy.md" if "# Deploy" in prompt else "",
+    )
+    applied = []
+    monkeypatch.setattr(
+        "bondocs.document.runbook.doc_manager.apply_patch",
+        lambda patch: applied.append(patch) or True,
+    )
+
+    assert update_runbooks()
+    assert applied == ["--- a/docs/runbook/deploy.md"]
+
+
+@pytest.fixture
+def response_cache(tmp_path, monkeypatch):
+    """Enable response caching with a temporary database."""
+    monkeypatch.setenv("BONDOCS_LLM_CACHE", "1")
+    monkeypatch.setattr(cache, "CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    cache.reset()
+    reset_cache()
+    yield
+    cache.reset()
+    reset_cache()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, DEFAULT_LLM_CONCURRENCY),
+        ("", DEFAULT_LLM_CONCURRENCY),
+        ("two", DEFAULT_LLM_CONCURRENCY),
+        ("0", 1),
+        ("-3", 1),
+        (" 8 ", 8),
+    ],
+)
+def test_llm_concurrency_is_parsed_defensively(value, expected, monkeypatch):
+    """Test that invalid or too small concurrency settings don't raise."""
+    if value is None:
+        monkeypatch.delenv("BONDOCS_LLM_CONCURRENCY", raising=False)
+    else:
+        monkeypatch.setenv("BONDOCS_LLM_CONCURRENCY", value)
+    assert _llm_concurrency() == expected
+
+
+def test_generate_runbook_patch_is_memoized(response_cache, monkeypatch):
+    """Test that identical runbook requests are answered from the cache."""
+    prompts = []
+    monkeypatch.setattr(
+        "bondocs.document.runbook.llm.generate_response",
+        lambda prompt: prompts.append(prompt) or "--- a/docs/runbook/deploy.md",
+    )
+
+    for _ in range(2):
+        assert (
+            generate_runbook_patch("x: +1 -0", "# Deploy\n", "docs/runbook/deploy.md")
+            == "--- a/docs/runbook/deploy.md"
+        )
+    generate_runbook_patch("x: +2 -0", "# Deploy\n", "docs/runbook/deploy.md")
+
+    assert len(prompts) == 2
+
+
+def test_runbook_patches_persist_across_runs(response_cache, monkeypatch):
+    """Test that patches are reused from disk after the memory cache is gone."""
+    responses = iter(["--- a/docs/runbook/deploy.md", "unexpected"])
+    monkeypatch.setattr(
+        "bondocs.document.runbook.llm.generate_response",
+        lambda prompt: next(responses),
+    )
+
+    generate_runbook_patch("x: +1 -0", "# Deploy\n", "docs/runbook/deploy.md")
+    cache.reset()
+    reset_cache()
+
+    assert (
+        generate_runbook_patch("x: +1 -0", "# Deploy\n", "docs/runbook/deploy.md")
+        == "--- a/docs/runbook/deploy.md"
+    )
+
+
+def test_update_runbooks_skips_unrelated_runbooks(tmp_path, runbook_dir, monkeypatch):
+    """Test that filtering leaves out runbooks and changes they don't mention."""
+    (runbook_dir / "rollback.md").write_text("# Rollback\n\nRun scripts/migrate.py\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BONDOCS_FILTER_RUNBOOKS", "1")
+    monkeypatch.setenv("BONDOCS_BATCH_RUNBOOKS", "0")
+    monkeypatch.setattr(
+        "bondocs.document.runbook.git.get_staged_diff",
+        lambda: (
+            "diff --git a/scripts/migrate.py b/scripts/migrate.py\n"
+            "--- a/scripts/migrate.py\n"
+            "+++ b/scripts/migrate.py\n"
+            "@@ -1 +1,2 @@\n"
+            " import db\n"
+            "+db.migrate()\n"
+            "diff --git a/web/app.py b/web/app.py\n"
+            "--- a/web/app.py\n"
+            "+++ b/web/app.py\n"
+            "@@ -1 +1,2 @@\n"
+            " import flask\n"
+            "+app = flask.Flask(__name__)\n"
+        ),
+    )
+    prompts = []
+    monkeypatch.setattr(
+        "bondocs.document.runbook.llm.generate_response",
+        lambda prompt: prompts.append(prompt) or "",
+    )
+
+    assert update_runbooks()
+    assert len(prompts) == 1
+    assert "# Rollback" in prompts[0]
+    assert "scripts/migrate.py: +1 -0" in prompts[0]
+    assert "web/app.py" not in prompts[0]
+
+
+def test_relevant_summary_matches_path_segments():
+    """Test that changed files are matched on whole names, not substrings."""
+    summaries = {
+        "scripts/migrate.py": "scripts/migrate.py: +1 -0",
+        "src/app.py": "src/app.py: +2 -1",
+    }
+
+    assert _relevant_summary("Run ./scripts/migrate.py.", summaries) == (
+        "scripts/migrate.py: +1 -0"
+    )
+    assert _relevant_summary("Restart the webapp and check resources.", summaries) == ""
+    assert _relevant_summary("See the app section.", summaries) == "src/app.py: +2 -1"